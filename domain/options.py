@@ -22,8 +22,21 @@ class Option(Enum):
     RESOLUTION = "resolution"
     FONT = "label-font"
     COLORMAP = "colormap"
+    COLORMAP_RANGE = "colormap-range"
     SHOW_LABELS = "show-labels"
     LABEL_LOCATION = "label-loc"
+    RENDER_MODE = "render-mode"
+    DENSITY_ALPHA = "density-alpha"
+    LOD = "lod"
+    LOD_THRESHOLD = "lod-threshold"
+    LOD_MIN_REACTIONS = "lod-min-reactions"
+    ENERGY_LAYOUT = "energy-layout"
+    COMPRESSION = "compression"
+    PALETTE = "palette"
+    QUALITY = "quality"
+    VECTOR_TOLERANCE = "vector-tolerance"
+    VERTEX_BUDGET = "vertex-budget"
+    RASTERIZE_CURVES = "rasterize-curves"
 
 
 class OptionDefinition:
@@ -175,14 +188,14 @@ class OptionsManager:
                 )
 
     def log(self) -> None:
-        [
-            logger.info(
-                "{} option for {}: {}={}".format(
-                    x.type.value, x.key, x.option.value, x.value
-                )
-            )
-            for x in self.get_option_type(OptionType.KEYWORD)
-        ]
+        Log.log_items(
+            logger,
+            "{} option".format(OptionType.KEYWORD.value),
+            (
+                "{} {}={}".format(x.key, x.option.value, x.value)
+                for x in self.get_option_type(OptionType.KEYWORD)
+            ),
+        )
         [
             logger.info("{} option {}={}".format(x.value, x.option.value, x.value))
             for x in self.get_option_type(OptionType.GLOBAL)
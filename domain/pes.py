@@ -10,6 +10,7 @@ class StationaryPoint:
         self._energy = energy
         self._sptype = sptype
         self._rxn_coord = None
+        self._energies: dict[str, float] = {}
 
     @property
     def name(self):
@@ -43,6 +44,14 @@ class StationaryPoint:
     def rxn_coord(self, rxn_coord: float):
         self._rxn_coord = rxn_coord
 
+    @property
+    def energies(self) -> dict[str, float]:
+        return self._energies
+
+    @energies.setter
+    def energies(self, energies: dict[str, float]):
+        self._energies = energies
+
 
 class Reaction:
     def __init__(
@@ -53,6 +62,7 @@ class Reaction:
         self._ts = ts
         self._x_coords = None
         self._y_coords = None
+        self._series: dict[str, np.ndarray] = {}
 
     @property
     def reac(self):
@@ -94,6 +104,14 @@ class Reaction:
     def y_coords(self, y_coords: np.ndarray):
         self._y_coords = y_coords
 
+    @property
+    def series(self) -> dict[str, np.ndarray]:
+        return self._series
+
+    @series.setter
+    def series(self, series: dict[str, np.ndarray]):
+        self._series = series
+
     def get_stationary_points(self) -> list[StationaryPoint]:
         return [self.reac, self.ts, self.prod]
 
@@ -102,15 +120,19 @@ class Reaction:
 
 
 class PES:
+    ENERGY_PREFIX = "energy_"
+
     def __init__(
         self,
         minima: list[StationaryPoint],
         ts: list[StationaryPoint],
         reactions: list[Reaction],
+        methods: list[str] = None,
     ):
         self._minima = minima
         self._ts = ts
         self._reactions = reactions
+        self._methods = methods if methods is not None else []
 
     @property
     def minima(self):
@@ -136,14 +158,41 @@ class PES:
     def reactions(self, reactions):
         self._reactions = reactions
 
+    @property
+    def methods(self) -> list[str]:
+        # energy_dft -> dft when there are several energy columns, otherwise empty
+        return self._methods
+
+    @methods.setter
+    def methods(self, methods: list[str]):
+        self._methods = methods
+
+    @classmethod
+    def get_energy_columns(cls, data: pd.DataFrame) -> dict[str, str]:
+        columns = [
+            x for x in data.columns if x == "energy" or x.startswith(cls.ENERGY_PREFIX)
+        ]
+        return {
+            column: (
+                column.removeprefix(cls.ENERGY_PREFIX) if column != "energy" else column
+            )
+            for column in columns
+        }
+
     @classmethod
     def from_dataframe(cls, data: pd.DataFrame) -> Self:
         minima = []
         ts = []
         rxns = []
 
+        columns = cls.get_energy_columns(data)
+        methods = list(columns.values()) if len(columns) > 1 else []
+        # with only energy_* columns, the first one is the primary energy
+        primary = "energy" if "energy" in columns else next(iter(columns))
+
         for index, row in data.iterrows():
-            sp = StationaryPoint(row["name"], row["energy"], row["type"])
+            sp = StationaryPoint(row["name"], row[primary], row["type"])
+            sp.energies = {method: row[column] for column, method in columns.items()}
             if sp.sptype == "TS":
                 ts.append(sp)
                 rxns.append(
@@ -160,7 +209,33 @@ class PES:
             r = Reaction(reac=reac, prod=prod, ts=tsstate)
             reactions.append(r)
 
-        return PES(minima=minima, ts=ts, reactions=reactions)
+        return PES(minima=minima, ts=ts, reactions=reactions, methods=methods)
+
+    def get_method_view(self, method: str) -> Self:
+        # energies and curves of one method on this surface's layout and connectivity
+        copies = {}
+        for sp in self.get_stationary_points():
+            copy = StationaryPoint(sp.name, sp.energies[method], sp.sptype)
+            copy.rxn_coord = sp.rxn_coord
+            copy.energies = sp.energies
+            copies[sp.name] = copy
+
+        reactions = []
+        for rxn in self.reactions:
+            r = Reaction(
+                reac=copies[rxn.reac.name],
+                prod=copies[rxn.prod.name],
+                ts=copies[rxn.ts.name],
+            )
+            r.x_coords = rxn.x_coords
+            r.y_coords = rxn.series[method]
+            reactions.append(r)
+
+        return PES(
+            minima=[copies[sp.name] for sp in self.minima],
+            ts=[copies[sp.name] for sp in self.ts],
+            reactions=reactions,
+        )
 
     def get_stationary_points(self) -> list[StationaryPoint]:
         return self.minima + self.ts
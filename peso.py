@@ -1,48 +1,212 @@
 import os.path
-from typing import Tuple
+from typing import Iterator, Tuple
 
 import click
 
-from domain.pes import PES, StationaryPoint
+from domain.pes import PES
+from service.analysis import EnergeticSpanAnalyser
+from service.animator import SurfaceAnimator
+from service.batch import BatchJob, BatchRunner
+from service.encoder import ImageEncoder
+from service.exporter import CurveExporter
+from service.figure import FigureTemplate
 from service.grid import PESGridEnhancer
+from service.importer import EnergyReader, PESImporter
 from service.logging import Log, title
 from service.parser import *
-from service.plotter import Plotter
+from service.plotter import Plotter, PlotterUtils
+from service.sink import ContactSheetSink, ImageSink, PdfSink
+from service.sweep import OptionSweep
+from service.watcher import InputWatcher
 
 logger = Log.get_logger(os.path.basename(__file__))
 
 
-def configure_io(output_file: str) -> str:
-    # input directory/file setup
+def get_output_dir() -> str:
     output_dir = os.path.join(os.getcwd(), "outputs")
     if not os.path.isdir(output_dir):
         os.makedirs(output_dir)
     logger.info("Will write outputs to {}".format(output_dir))
+    return output_dir
+
+
+def configure_io(output_file: str) -> str:
+    # input directory/file setup
+    output_dir = get_output_dir()
     logger.info("Output file: {}".format(output_file))
     output_file = os.path.join(output_dir, output_file)
     return output_file
 
 
+def log_surface(surface: PES) -> None:
+    Log.log_items(
+        logger,
+        "Stationary point",
+        (
+            "{} {} {}".format(sp.name, sp.energy, sp.sptype)
+            for sp in surface.minima + surface.ts
+        ),
+    )
+    Log.log_items(logger, "Reaction", (rxn.get_name() for rxn in surface.reactions))
+
+
 def process_inputs(input_file: str) -> Tuple[PES, OptionsManager]:
     logger.info("Processing input file {}".format(input_file))
     parser = PESInputFileParser()
     data, opt_mgr = parser.read_input_file(input_file)
     surface = PES.from_dataframe(data)
-    for sp in surface.minima + surface.ts:
-        sp: StationaryPoint
-        logger.info("Stationary point: {} {} {}".format(sp.name, sp.energy, sp.sptype))
-    for rxn in surface.reactions:
-        logger.info("Reaction: {}".format(rxn.get_name()))
+    log_surface(surface)
+    return surface, opt_mgr
+
+
+def process_sections(name: str, sections: dict) -> Tuple[PES, OptionsManager]:
+    logger.info("Processing surface {}".format(name))
+    data = PESInputFileParser.dataframe_from_sections(sections)
+    opt_mgr = PESInputFileParser.options_from_sections(sections)
+    surface = PES.from_dataframe(data)
+    log_surface(surface)
     return surface, opt_mgr
 
 
-def runner(input_file: str, output_file: str) -> None:
+def iter_sections(input_path: str) -> Iterator[Tuple[str, dict]]:
+    # a folder of .dat files, a bundle, or a single input file
+    if os.path.isdir(input_path):
+        parser = PESInputFileParser()
+        for file in PESInputFileParser.get_input_files(input_path):
+            yield os.path.splitext(os.path.split(file)[-1])[0], parser.read_sections(
+                file
+            )
+    elif PESBundleParser.is_bundle(input_path):
+        yield from PESBundleParser(input_path).surfaces()
+    else:
+        name = os.path.splitext(os.path.split(input_path)[-1])[0]
+        yield name, PESInputFileParser().read_sections(input_path)
+
+
+def bundle_output_file(name: str, output_format: str = "png") -> str:
+    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+    return "{}.{}".format(safe_name, output_format)
+
+
+def runner(
+    input_file: str,
+    output_file: str,
+    template: FigureTemplate = None,
+    sink: ImageSink = None,
+    encoder: ImageEncoder = None,
+) -> None:
     output_file = configure_io(output_file)
 
     # run the pes plotter
     surface, opt_mgr = process_inputs(input_file)
     PESGridEnhancer.enhance_surface(surface)
-    Plotter(surface, output_file, opt_mgr).plot()
+    Plotter(
+        surface, output_file, opt_mgr, template=template, sink=sink, encoder=encoder
+    ).plot()
+
+
+def encoder_options(command):
+    options = [
+        click.option(
+            "--compression",
+            default=None,
+            type=click.IntRange(0, 9),
+            help="PNG compression level (0 fastest, 9 smallest), overrides the "
+            "global option.",
+        ),
+        click.option(
+            "--palette",
+            default=None,
+            type=click.IntRange(0, 256),
+            help="Write indexed PNGs with at most this many colors, 0 disables.",
+        ),
+        click.option(
+            "--quality",
+            default=None,
+            type=click.IntRange(1, 100),
+            help="WebP/JPEG quality, 100 writes lossless WebP.",
+        ),
+        click.option(
+            "--encode-threads",
+            default=0,
+            type=click.IntRange(0),
+            help="Threads encoding images in the background, 0 encodes in line.",
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def create_encoder(
+    compression: int | None,
+    palette: int | None,
+    quality: int | None,
+    encode_threads: int,
+) -> ImageEncoder:
+    return ImageEncoder(
+        compression=compression,
+        palette=palette,
+        quality=quality,
+        threads=encode_threads,
+    )
+
+
+def sink_options(command):
+    options = [
+        click.option(
+            "--pdf",
+            default=None,
+            help="Write all surfaces as pages of a single PDF in ./outputs/.",
+        ),
+        click.option(
+            "--contact-sheet",
+            default=None,
+            help="Tile all surfaces into contact sheet PNGs in ./outputs/.",
+        ),
+        click.option("--sheet-columns", default=4, help="Tiles per contact sheet row."),
+        click.option("--sheet-rows", default=4, help="Tile rows per contact sheet."),
+        click.option("--sheet-dpi", default=100, help="Resolution of each tile."),
+        click.option(
+            "--format",
+            "output_format",
+            default="png",
+            type=click.Choice(["png", "webp", "jpg", "svg", "pdf", "html", "json"]),
+            help="Output format of each surface, html and json are drawn in the "
+            "browser.",
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def create_sink(
+    pdf: str | None,
+    contact_sheet: str | None,
+    sheet_columns: int,
+    sheet_rows: int,
+    sheet_dpi: int,
+    output_format: str = "png",
+) -> ImageSink | None:
+    if pdf is not None and contact_sheet is not None:
+        raise click.UsageError("Use only one of --pdf and --contact-sheet")
+    if output_format != "png" and (pdf is not None or contact_sheet is not None):
+        raise click.UsageError(
+            "--format {} cannot be combined with --pdf or --contact-sheet".format(
+                output_format
+            )
+        )
+    if pdf is not None:
+        return PdfSink(configure_io(pdf))
+    if contact_sheet is not None:
+        return ContactSheetSink(
+            configure_io(contact_sheet),
+            columns=sheet_columns,
+            rows=sheet_rows,
+            dpi=sheet_dpi,
+        )
+    return None
 
 
 @click.command()
@@ -51,10 +215,12 @@ def runner(input_file: str, output_file: str) -> None:
     "-o",
     "--output-file",
     default="pes.png",
-    help="Path to your output file.",
+    help="Path to your output file, .png, .webp, .jpg, .html or .json.",
 )
-def run(input_file: str, output_file: str) -> None:
-    runner(input_file, output_file)
+@encoder_options
+def run(input_file: str, output_file: str, **encoder_kwargs) -> None:
+    with create_encoder(**encoder_kwargs) as encoder:
+        runner(input_file, output_file, encoder=encoder)
 
 
 @click.command()
@@ -64,24 +230,442 @@ def run(input_file: str, output_file: str) -> None:
     default="./inputs/",
     help="Path to a folder containing your input files.",
 )
-def run_all(input_dir: str) -> None:
+@sink_options
+@encoder_options
+def run_all(
+    input_dir: str,
+    output_format: str,
+    pdf: str | None,
+    contact_sheet: str | None,
+    sheet_columns: int,
+    sheet_rows: int,
+    sheet_dpi: int,
+    **encoder_kwargs,
+) -> None:
     files = PESInputFileParser.get_input_files(input_dir)
-    for file in files:
+    sink = create_sink(
+        pdf, contact_sheet, sheet_columns, sheet_rows, sheet_dpi, output_format
+    )
+    encoder = create_encoder(**encoder_kwargs)
+    # every figure shares the same size and labels, so build it once
+    template = Plotter.create_template()
+    try:
+        for file in files:
+            try:
+                output_file = os.path.split(file)[-1].replace(
+                    ".dat", "." + output_format
+                )
+                runner(file, output_file, template, sink, encoder)
+            except Exception as e:
+                logger.error("Error processing file: {} {}".format(file, e))
+    finally:
+        template.close()
+        encoder.close()
+        PlotterUtils.close_all()
+        if sink is not None:
+            sink.close()
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input-file",
+    default="./inputs/bundle.jsonl",
+    type=click.Path(exists=True),
+    help="Path to a bundle of named surfaces (.jsonl or text).",
+)
+@sink_options
+@encoder_options
+def run_bundle(
+    input_file: str,
+    output_format: str,
+    pdf: str | None,
+    contact_sheet: str | None,
+    sheet_columns: int,
+    sheet_rows: int,
+    sheet_dpi: int,
+    **encoder_kwargs,
+) -> None:
+    # surfaces are parsed, rendered and released one at a time
+    sink = create_sink(
+        pdf, contact_sheet, sheet_columns, sheet_rows, sheet_dpi, output_format
+    )
+    encoder = create_encoder(**encoder_kwargs)
+    template = Plotter.create_template()
+    try:
+        for name, sections in PESBundleParser(input_file).surfaces():
+            try:
+                output_file = configure_io(bundle_output_file(name, output_format))
+                surface, opt_mgr = process_sections(name, sections)
+                PESGridEnhancer.enhance_surface(surface)
+                Plotter(
+                    surface,
+                    output_file,
+                    opt_mgr,
+                    template=template,
+                    sink=sink,
+                    encoder=encoder,
+                ).plot()
+            except Exception as e:
+                logger.error("Error processing surface: {} {}".format(name, e))
+    finally:
+        template.close()
+        encoder.close()
+        PlotterUtils.close_all()
+        if sink is not None:
+            sink.close()
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input-path",
+    default="./inputs/",
+    help="Path to an input file, or a folder of input files, to watch.",
+)
+@click.option(
+    "-o",
+    "--output-file",
+    default=None,
+    help="Output file when watching a single input file.",
+)
+@click.option(
+    "--interval", default=0.5, help="Seconds between checks for modified files."
+)
+@click.option(
+    "--debounce",
+    default=0.5,
+    help="Seconds a file must be unchanged before it is re-rendered.",
+)
+def watch(
+    input_path: str, output_file: str | None, interval: float, debounce: float
+) -> None:
+    template = Plotter.create_template()
+
+    def render(file: str, surface: PES, opt_mgr: OptionsManager) -> None:
+        output = output_file
+        if output is None or os.path.isdir(input_path):
+            output = os.path.split(file)[-1].replace(".dat", ".png")
+        Plotter(surface, configure_io(output), opt_mgr, template=template).plot()
+
+    try:
+        InputWatcher(input_path, render, interval=interval, debounce=debounce).run()
+    finally:
+        template.close()
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input-path",
+    default="./inputs/",
+    type=click.Path(exists=True),
+    help="Path to an input file, a bundle, or a folder of input files.",
+)
+@click.option(
+    "-o",
+    "--output-file",
+    default="curves.npz",
+    help="Export file in ./outputs/, one of .npz, .csv or .parquet.",
+)
+def export(input_path: str, output_file: str) -> None:
+    try:
+        CurveExporter.check_format(output_file)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    exporter = CurveExporter()
+    for name, sections in iter_sections(input_path):
         try:
-            runner(file, os.path.split(file)[-1].replace(".dat", ".png"))
+            surface, _ = process_sections(name, sections)
+            PESGridEnhancer.enhance_surface(surface)
+            exporter.add(name, surface)
         except Exception as e:
-            logger.error("Error processing file: {} {}".format(file, e))
+            logger.error("Error processing surface: {} {}".format(name, e))
+    exporter.write(configure_io(output_file))
+
+
+@click.command()
+@click.option("-i", "--input-file", default="pes.dat", help="Path to your input file.")
+@click.option(
+    "-o",
+    "--output-file",
+    default="pes.gif",
+    help="Animation file in ./outputs/, .gif or .mp4 (requires ffmpeg).",
+)
+@click.option(
+    "--mode",
+    default="reveal",
+    type=click.Choice(SurfaceAnimator.MODES),
+    help="Reveal reactions one by one, highlight channels in turn, or sweep a "
+    "pathway.",
+)
+@click.option(
+    "--fps", default=None, type=int, help="Frames per second, defaults per mode."
+)
+@click.option("--dpi", default=100, help="Resolution of each frame.")
+@click.option(
+    "--path",
+    default=None,
+    help="Comma separated minima to sweep through, e.g. M1,M2,M4.",
+)
+def animate(
+    input_file: str,
+    output_file: str,
+    mode: str,
+    fps: int | None,
+    dpi: int,
+    path: str | None,
+) -> None:
+    output_file = configure_io(output_file)
+    surface, opt_mgr = process_inputs(input_file)
+    PESGridEnhancer.enhance_surface(surface)
+    SurfaceAnimator(
+        Plotter(surface, output_file, opt_mgr),
+        mode=mode,
+        fps=fps,
+        dpi=dpi,
+        path=None if path is None else [name.strip() for name in path.split(",")],
+    ).animate(output_file)
+
+
+@click.command()
+@click.option("-i", "--input-file", default="pes.dat", help="Path to your input file.")
+@click.option(
+    "-g",
+    "--grid",
+    multiple=True,
+    required=True,
+    help='Global option values to sweep, e.g. -g "colormap=viridis;plasma". '
+    'Use "all" to sweep every colormap or label-font.',
+)
+@click.option(
+    "--workers",
+    default=os.cpu_count(),
+    help="Number of processes rendering variants in parallel.",
+)
+@sink_options
+def sweep(
+    input_file: str,
+    grid: Tuple[str],
+    workers: int,
+    output_format: str,
+    **sink_kwargs,
+) -> None:
+    try:
+        grid = OptionSweep.parse_grid(list(grid))
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    sink = create_sink(output_format=output_format, **sink_kwargs)
+    prefix = os.path.splitext(os.path.split(input_file)[-1])[0]
+    output_dir = get_output_dir()
+
+    # the surface and curves are computed once and shared by every variant
+    surface, opt_mgr = process_inputs(input_file)
+    PESGridEnhancer.enhance_surface(surface)
+    try:
+        OptionSweep(surface, opt_mgr, workers=workers).run(
+            grid, output_dir, prefix, sink=sink, output_format=output_format
+        )
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input-path",
+    default="./inputs/",
+    type=click.Path(exists=True),
+    help="Path to an input file, a bundle, or a folder of input files.",
+)
+@click.option(
+    "-o",
+    "--output-file",
+    default="span.csv",
+    help="CSV report in ./outputs/.",
+)
+@click.option("--start", default=None, help="First minimum, defaults to the first.")
+@click.option("--end", default=None, help="Last minimum, defaults to the last.")
+@click.option("--temperature", default=298.15, help="Temperature in K.")
+@click.option(
+    "--samples",
+    default=0,
+    help="Number of randomly perturbed copies of each surface for sensitivity.",
+)
+@click.option(
+    "--sigma", default=4.0, help="Standard deviation of perturbations in kJ/mol."
+)
+@click.option("--seed", default=None, type=int, help="Seed for the perturbations.")
+@click.option(
+    "--max-pathways", default=1000, help="Maximum pathways enumerated per surface."
+)
+def analyse(
+    input_path: str,
+    output_file: str,
+    start: str | None,
+    end: str | None,
+    temperature: float,
+    samples: int,
+    sigma: float,
+    seed: int | None,
+    max_pathways: int,
+) -> None:
+    analyser = EnergeticSpanAnalyser(
+        temperature=temperature,
+        samples=samples,
+        sigma=sigma,
+        seed=seed,
+        max_pathways=max_pathways,
+    )
+    rows = []
+    for name, sections in iter_sections(input_path):
+        try:
+            surface, _ = process_sections(name, sections)
+            rows += analyser.analyse(name, surface, start=start, end=end)
+        except Exception as e:
+            logger.error("Error processing surface: {} {}".format(name, e))
+    EnergeticSpanAnalyser.write(rows, configure_io(output_file))
+
+
+@click.command(name="import")
+@click.option(
+    "-i",
+    "--input-dir",
+    default="./calculations/",
+    help="Folder of Gaussian/ORCA (.log, .out) and .xyz output files.",
+)
+@click.option(
+    "-m",
+    "--mapping-file",
+    default="mapping.txt",
+    help="Table of name, type, reactant, product and optionally file per species.",
+)
+@click.option(
+    "-o",
+    "--output-file",
+    default="./inputs/imported.dat",
+    help="PES input file to write.",
+)
+@click.option(
+    "--energy",
+    default="electronic",
+    type=click.Choice(EnergyReader.KINDS),
+    help="Final SCF energy or Gibbs free energy from a frequency calculation.",
+)
+@click.option(
+    "--reference",
+    default=None,
+    help="Species at zero energy, defaults to the first minimum.",
+)
+@click.option(
+    "--workers",
+    default=os.cpu_count(),
+    help="Number of processes reading output files in parallel.",
+)
+def import_outputs(
+    input_dir: str,
+    mapping_file: str,
+    output_file: str,
+    energy: str,
+    reference: str | None,
+    workers: int,
+) -> None:
+    importer = PESImporter(
+        input_dir, mapping_file, kind=energy, reference=reference, workers=workers
+    )
+    output_dir = os.path.dirname(output_file)
+    if output_dir and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    try:
+        surface = importer.write(output_file)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e))
+    log_surface(surface)
+
+
+@click.command()
+@click.option(
+    "-i",
+    "--input-dir",
+    default="./inputs/",
+    help="Path to a folder containing your input files.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    default="png",
+    type=click.Choice(["png", "webp", "jpg", "svg", "pdf", "html", "json"]),
+    help="Output format of each surface.",
+)
+@click.option(
+    "--max-rss",
+    default=1024.0,
+    help="Memory ceiling of a worker in MB, after which it is replaced by a "
+    "fresh process. 0 disables the ceiling.",
+)
+@click.option("--workers", default=1, help="Number of worker processes.")
+@click.option(
+    "--report",
+    default=None,
+    help="CSV report in ./outputs/ with the time and memory of every file.",
+)
+@encoder_options
+def batch(
+    input_dir: str,
+    output_format: str,
+    max_rss: float,
+    workers: int,
+    report: str | None,
+    **encoder_kwargs,
+) -> None:
+    jobs = [
+        BatchJob(
+            file,
+            configure_io(
+                os.path.splitext(os.path.split(file)[-1])[0] + "." + output_format
+            ),
+        )
+        for file in PESInputFileParser.get_input_files(input_dir)
+    ]
+    runner = BatchRunner(
+        max_rss_mb=max_rss,
+        workers=workers,
+        encoder_kwargs={
+            "threads": encoder_kwargs.pop("encode_threads"),
+            **encoder_kwargs,
+        },
+    )
+    results = runner.run(jobs)
+    if report is not None:
+        BatchRunner.write(results, configure_io(report))
 
 
 @click.group()
-def cli() -> None:
-    pass
+@click.option(
+    "--log-level",
+    default="INFO",
+    type=click.Choice(Log.LEVELS, case_sensitive=False),
+    help="Minimum level of log messages to show.",
+)
+@click.option("-q", "--quiet", is_flag=True, help="Only show warnings and errors.")
+def cli(log_level: str, quiet: bool) -> None:
+    Log.set_level("WARNING" if quiet else log_level)
+    if not quiet:
+        title()
 
 
 # Add commands to the group
 cli.add_command(run_all)
 cli.add_command(run)
+cli.add_command(run_bundle)
+cli.add_command(batch)
+cli.add_command(export)
+cli.add_command(watch)
+cli.add_command(animate)
+cli.add_command(sweep)
+cli.add_command(analyse)
+cli.add_command(import_outputs)
 
 if __name__ == "__main__":
-    title()
     cli()
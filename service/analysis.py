@@ -0,0 +1,251 @@
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
+
+from domain.pes import PES, Reaction, StationaryPoint
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class Pathway:
+    # I0 -T1-> I1 -T2-> ... -Tn-> In, with no minimum visited twice
+    def __init__(self, minima: list[StationaryPoint], reactions: list[Reaction]):
+        self._minima = minima
+        self._reactions = reactions
+
+    @property
+    def minima(self) -> list[StationaryPoint]:
+        return self._minima
+
+    @property
+    def reactions(self) -> list[Reaction]:
+        return self._reactions
+
+    @property
+    def ts(self) -> list[StationaryPoint]:
+        return [rxn.ts for rxn in self.reactions]
+
+    def get_name(self) -> str:
+        names = [self.minima[0].name]
+        for rxn, species in zip(self.reactions, self.minima[1:]):
+            names += [rxn.ts.name, species.name]
+        return "->".join(names)
+
+
+class EnergeticSpanAnalyser:
+    # energetic span model (Kozuch and Shaik), sample 0 is the unperturbed surface
+
+    GAS_CONSTANT = 8.314462618e-3  # kJ mol^-1 K^-1
+    BOLTZMANN_OVER_PLANCK = 2.083661912e10  # s^-1 K^-1
+
+    def __init__(
+        self,
+        temperature: float = 298.15,
+        samples: int = 0,
+        sigma: float = 0.0,
+        seed: Optional[int] = None,
+        max_pathways: int = 1000,
+    ):
+        self._temperature = temperature
+        self._samples = samples
+        self._sigma = sigma
+        self._rng = np.random.default_rng(seed)
+        self._max_pathways = max_pathways
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def sigma(self) -> float:
+        return self._sigma
+
+    @property
+    def max_pathways(self) -> int:
+        return self._max_pathways
+
+    def get_tof(self, span: np.ndarray) -> np.ndarray:
+        rt = self.GAS_CONSTANT * self.temperature
+        return self.BOLTZMANN_OVER_PLANCK * self.temperature * np.exp(-span / rt)
+
+    def get_effective_span(self, spans: np.ndarray) -> np.ndarray:
+        # -RT ln sum exp(-span / RT), the span of the summed TOFs, evaluated
+        # without the TOFs themselves, which underflow for high barriers
+        rt = self.GAS_CONSTANT * self.temperature
+        return -rt * logsumexp(-spans / rt, axis=0)
+
+    def get_energies(self, surface: PES) -> np.ndarray:
+        energies = np.array(
+            [sp.energy for sp in surface.get_stationary_points()], dtype=float
+        )
+        if self.samples == 0:
+            return energies[None, :]
+        noise = self._rng.normal(0.0, self.sigma, (self.samples, len(energies)))
+        return np.vstack([energies, energies + noise])
+
+    @classmethod
+    def find_minimum(cls, surface: PES, name: Optional[str], default: int) -> any:
+        if name is None:
+            return surface.minima[default] if len(surface.minima) > 0 else None
+        matches = [sp for sp in surface.minima if sp.name == name]
+        if len(matches) == 0:
+            raise ValueError("Unknown minimum {}".format(name))
+        return matches[0]
+
+    def find_pathways(
+        self, surface: PES, start: StationaryPoint, end: StationaryPoint
+    ) -> list[Pathway]:
+        neighbours: dict[str, list[tuple[Reaction, StationaryPoint]]] = {}
+        for rxn in surface.reactions:
+            neighbours.setdefault(rxn.reac.name, []).append((rxn, rxn.prod))
+            neighbours.setdefault(rxn.prod.name, []).append((rxn, rxn.reac))
+
+        # iterative depth first search over simple paths
+        pathways = []
+        stack = [([start], [])]
+        while len(stack) > 0 and len(pathways) < self.max_pathways:
+            minima, reactions = stack.pop()
+            if minima[-1] is end:
+                pathways.append(Pathway(minima, reactions))
+                continue
+            visited = {sp.name for sp in minima}
+            for rxn, species in reversed(neighbours.get(minima[-1].name, [])):
+                if species.name not in visited:
+                    stack.append((minima + [species], reactions + [rxn]))
+        if len(stack) > 0:
+            logger.warning(
+                "Stopped after {} pathways from {} to {}".format(
+                    self.max_pathways, start.name, end.name
+                )
+            )
+        return pathways
+
+    @classmethod
+    def get_span_matrix(
+        cls, energies: np.ndarray, intermediates: np.ndarray, ts: np.ndarray
+    ) -> np.ndarray:
+        # (samples, n, n) T_j - I_i, plus the reaction energy when T_j precedes I_i
+        i = energies[:, intermediates[:-1]]
+        t = energies[:, ts]
+        reaction_energy = energies[:, intermediates[-1]] - energies[:, intermediates[0]]
+        n = len(ts)
+        # T_(j+1) follows I_i when j >= i, otherwise the cycle must turn over once
+        before = np.arange(n)[None, :] < np.arange(n)[:, None]
+        return (
+            t[:, None, :]
+            - i[:, :, None]
+            + before[None, :, :] * reaction_energy[:, None, None]
+        )
+
+    def analyse_pathway(
+        self, pathway: Pathway, energies: np.ndarray, index: dict[str, int]
+    ) -> tuple[dict, np.ndarray]:
+        intermediates = np.array([index[sp.name] for sp in pathway.minima])
+        ts = np.array([index[sp.name] for sp in pathway.ts])
+        spans = self.get_span_matrix(energies, intermediates, ts)
+        n = len(ts)
+        flat = spans.reshape(len(energies), -1)
+        best = np.argmax(flat, axis=1)
+        span = flat[np.arange(len(energies)), best]
+        tdi, tdts = np.divmod(best, n)
+
+        result = {
+            "pathway": pathway.get_name(),
+            "steps": n,
+            "reaction_energy": energies[0, intermediates[-1]]
+            - energies[0, intermediates[0]],
+            "tdi": pathway.minima[tdi[0]].name,
+            "tdts": pathway.ts[tdts[0]].name,
+            "span": span[0],
+            "tof": self.get_tof(span[0]),
+        }
+        if len(energies) > 1:
+            perturbed = span[1:]
+            result.update(
+                {
+                    "span_mean": perturbed.mean(),
+                    "span_std": perturbed.std(),
+                    "span_p05": np.percentile(perturbed, 5),
+                    "span_p95": np.percentile(perturbed, 95),
+                    "tdts_stability": np.mean(tdts[1:] == tdts[0]),
+                    "tdi_stability": np.mean(tdi[1:] == tdi[0]),
+                }
+            )
+        return result, span
+
+    def analyse(
+        self,
+        name: str,
+        surface: PES,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> list[dict]:
+        # one row per pathway from start to end and one for the whole network
+        first = self.find_minimum(surface, start, 0)
+        last = self.find_minimum(surface, end, -1)
+        if first is None or first is last:
+            logger.warning("No pathway to analyse for surface {}".format(name))
+            return []
+        pathways = self.find_pathways(surface, first, last)
+        if len(pathways) == 0:
+            logger.warning(
+                "No pathway from {} to {} in surface {}".format(
+                    first.name, last.name, name
+                )
+            )
+            return []
+
+        energies = self.get_energies(surface)
+        index = {sp.name: i for i, sp in enumerate(surface.get_stationary_points())}
+        rows, spans = [], []
+        for pathway in pathways:
+            row, span = self.analyse_pathway(pathway, energies, index)
+            rows.append({"surface": name, "record": "pathway", **row})
+            spans.append(span)
+
+        # parallel pathways add their turnover frequencies
+        spans = np.array(spans)
+        effective = self.get_effective_span(spans)
+        tof = self.get_tof(effective)
+        best = rows[int(np.argmin(spans[:, 0]))]
+        network = {
+            "surface": name,
+            "record": "network",
+            "pathway": best["pathway"],
+            "steps": best["steps"],
+            "reaction_energy": best["reaction_energy"],
+            "tdi": best["tdi"],
+            "tdts": best["tdts"],
+            "span": effective[0],
+            "tof": tof[0],
+        }
+        if len(energies) > 1:
+            network.update(
+                {
+                    "span_mean": effective[1:].mean(),
+                    "span_std": effective[1:].std(),
+                    "span_p05": np.percentile(effective[1:], 5),
+                    "span_p95": np.percentile(effective[1:], 95),
+                }
+            )
+        logger.info(
+            "Surface {}: {} pathways, effective span {:.2f} kJ/mol, TDI {}, TDTS {}".format(
+                name, len(pathways), network["span"], network["tdi"], network["tdts"]
+            )
+        )
+        return [network] + rows
+
+    @classmethod
+    def write(cls, rows: list[dict], filename: str) -> pd.DataFrame:
+        report = pd.DataFrame(rows)
+        logger.info("Writing {} report rows to {}".format(len(report), filename))
+        report.to_csv(filename, index=False)
+        return report
@@ -0,0 +1,260 @@
+import os
+from typing import Optional
+
+import numpy as np
+from matplotlib.animation import AbstractMovieWriter, FFMpegWriter, writers
+from PIL import Image
+
+from domain.pes import Reaction
+from service.logging import Log
+from service.plotter import Plotter, PlotterUtils
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class BlitPillowWriter(AbstractMovieWriter):
+    # GIF writer taking frames from the blitted canvas instead of re-saving
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._images: list[Image.Image] = []
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+        self._images = []
+
+    def grab_frame(self, **savefig_kwargs):
+        buffer = np.asarray(self.fig.canvas.buffer_rgba())
+        self._images.append(Image.fromarray(buffer[..., :3].copy(), mode="RGB"))
+
+    def finish(self):
+        self._images[0].save(
+            self.outfile,
+            save_all=True,
+            append_images=self._images[1:],
+            duration=int(1000 / self.fps),
+            loop=0,
+        )
+        self._images = []
+
+
+class BlitFFMpegWriter(FFMpegWriter):
+    # pipes the blitted canvas to ffmpeg as raw rgba frames
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frame_format = "rgba"
+
+    def grab_frame(self, **savefig_kwargs):
+        self._proc.stdin.write(self.fig.canvas.buffer_rgba())
+
+
+class SurfaceAnimator:
+    # frames restore a cached background and draw only the artists that change
+
+    MODES = ["reveal", "highlight", "sweep"]
+    DEFAULT_FPS = {"reveal": 2, "highlight": 2, "sweep": 25}
+    FORMATS = [".gif", ".mp4"]
+
+    def __init__(
+        self,
+        plotter: Plotter,
+        mode: str = "reveal",
+        fps: Optional[int] = None,
+        dpi: int = 100,
+        path: Optional[list[str]] = None,
+        step: int = 4,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(
+                "Unknown animation mode {}, use one of {}".format(
+                    mode, ", ".join(self.MODES)
+                )
+            )
+        self._plotter = plotter
+        self._mode = mode
+        self._fps = self.DEFAULT_FPS[mode] if fps is None else fps
+        self._dpi = dpi
+        self._path = path
+        self._step = step
+        self._background = None
+
+    @property
+    def plotter(self) -> Plotter:
+        return self._plotter
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def fps(self) -> int:
+        return self._fps
+
+    @property
+    def dpi(self) -> int:
+        return self._dpi
+
+    def get_writer(self, output_file: str) -> any:
+        ext = os.path.splitext(output_file)[-1].lower()
+        if ext == ".gif":
+            return BlitPillowWriter(fps=self.fps)
+        if ext == ".mp4":
+            if not writers.is_available("ffmpeg"):
+                raise ValueError("MP4 output requires ffmpeg to be installed")
+            return BlitFFMpegWriter(fps=self.fps)
+        raise ValueError(
+            "Unsupported animation format {}, use one of {}".format(
+                ext, ", ".join(self.FORMATS)
+            )
+        )
+
+    def plot_line(self, axis: any, rxn: Reaction, i: int, **kwargs) -> any:
+        style = self.plotter.compile_style()
+        kwargs = {
+            "color": style.colors[i],
+            "linestyle": style.linestyles[i],
+            "linewidth": style.linewidths[i],
+            **kwargs,
+        }
+        return axis.plot(rxn.x_coords, rxn.y_coords, **kwargs)[0]
+
+    def draw_static(self, axis: any) -> None:
+        # hidden channel markers and labels never change between frames
+        for channel in self.plotter.get_channels():
+            if len(channel.hidden) > 0:
+                self.plotter.plot_hidden_channels(axis, channel)
+        self.plotter.add_labels(axis)
+        self.plotter.set_limits(axis)
+
+    def cache_background(self, figure: any) -> None:
+        self._background = figure.canvas.copy_from_bbox(figure.bbox)
+
+    def blit(self, figure: any, axis: any, artists: list[any]) -> None:
+        figure.canvas.restore_region(self._background)
+        for artist in artists:
+            axis.draw_artist(artist)
+
+    def get_path_reactions(self) -> list[tuple[Reaction, bool]]:
+        # reactions along the path and whether each is swept backwards
+        reactions = self.plotter.get_visible_reactions()
+        if self._path is None:
+            order = sorted(reactions, key=lambda rxn: np.min(rxn.x_coords))
+            return [(rxn, False) for rxn in order]
+
+        steps = []
+        for start, end in zip(self._path, self._path[1:]):
+            candidates = [
+                rxn
+                for rxn in reactions
+                if {rxn.reac.name, rxn.prod.name} == {start, end}
+            ]
+            if len(candidates) == 0:
+                raise ValueError(
+                    "No reaction connects {} and {} on the sweep path".format(
+                        start, end
+                    )
+                )
+            rxn = candidates[0]
+            # curves always run left to right, so the direction follows from
+            # which end the start minimum sits at
+            minimum = rxn.reac if rxn.reac.name == start else rxn.prod
+            steps.append((rxn, not np.isclose(minimum.rxn_coord, rxn.x_coords[0])))
+        return steps
+
+    def get_sweep_points(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # marker positions and where each reaction starts, so legs are not joined
+        xs, ys = [], []
+        for rxn, backwards in self.get_path_reactions():
+            x, y = rxn.x_coords, rxn.y_coords
+            if backwards:
+                x, y = x[::-1], y[::-1]
+            # the last point is kept whatever the step, so the marker reaches
+            # the end of every reaction
+            keep = np.arange(0, len(x), self._step)
+            if keep[-1] != len(x) - 1:
+                keep = np.append(keep, len(x) - 1)
+            xs.append(x[keep])
+            ys.append(y[keep])
+        starts = np.zeros(sum(len(x) for x in xs), dtype=bool)
+        starts[np.cumsum([0] + [len(x) for x in xs[:-1]])] = True
+        return np.concatenate(xs), np.concatenate(ys), starts
+
+    def animate_reveal(self, figure: any, axis: any, writer: any) -> int:
+        channels = sorted(
+            self.plotter.get_channels(), key=lambda channel: channel.lowest.ts.energy
+        )
+        writer.grab_frame()
+        for channel in channels:
+            line = self.plot_line(
+                axis, channel.lowest, channel.lowest_index, animated=True
+            )
+            self.blit(figure, axis, [line])
+            writer.grab_frame()
+            # the revealed curve becomes part of the background for later frames
+            self.cache_background(figure)
+        return len(channels) + 1
+
+    def animate_highlight(self, figure: any, axis: any, writer: any) -> int:
+        style = self.plotter.compile_style()
+        lines = [
+            self.plot_line(
+                axis,
+                channel.lowest,
+                channel.lowest_index,
+                animated=True,
+                linewidth=2 * style.linewidths[channel.lowest_index],
+            )
+            for channel in self.plotter.get_channels()
+        ]
+        for line in lines:
+            self.blit(figure, axis, [line])
+            writer.grab_frame()
+        return len(lines)
+
+    def animate_sweep(self, figure: any, axis: any, writer: any) -> int:
+        x, y, starts = self.get_sweep_points()
+        (trail,) = axis.plot([], [], color="k", linewidth=2, animated=True)
+        (marker,) = axis.plot([], [], "o", color="r", markersize=8, animated=True)
+        for i in range(len(x)):
+            # only the newest trail segment is drawn, older ones are background
+            first = i if starts[i] else i - 1
+            trail.set_data(x[first : i + 1], y[first : i + 1])
+            self.blit(figure, axis, [trail])
+            self.cache_background(figure)
+            marker.set_data(x[i : i + 1], y[i : i + 1])
+            axis.draw_artist(marker)
+            writer.grab_frame()
+        return len(x)
+
+    def animate(self, output_file: str) -> None:
+        writer = self.get_writer(output_file)
+        self.plotter.compile_style()
+        figure, axis = PlotterUtils.create_figure(
+            xlabel="Reaction Coordinate / arb. units",
+            ylabel="Energy / kJ mol$^{-1}$",
+            title="",
+        )
+        figure.set_dpi(self.dpi)
+        try:
+            writer.setup(figure, output_file, dpi=self.dpi)
+            self.draw_static(axis)
+            if self.mode != "reveal":
+                # the whole surface is background, faded when channels take turns
+                alpha = 0.25 if self.mode == "highlight" else 1.0
+                for channel in self.plotter.get_channels():
+                    self.plot_line(
+                        axis, channel.lowest, channel.lowest_index, alpha=alpha
+                    )
+            figure.canvas.draw()
+            self.cache_background(figure)
+
+            logger.info("Animating surface in {} mode".format(self.mode))
+            frames = getattr(self, "animate_" + self.mode)(figure, axis, writer)
+            logger.info(
+                "Writing {} frames at {} fps to {}".format(
+                    frames, self.fps, output_file
+                )
+            )
+            writer.finish()
+        finally:
+            PlotterUtils.close_image(figure)
+            PlotterUtils.close_all()
@@ -0,0 +1,264 @@
+import gc
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Optional
+
+import pandas as pd
+
+from domain.pes import PES
+from service.encoder import ImageEncoder
+from service.figure import FigureTemplate
+from service.grid import PESGridEnhancer
+from service.logging import Log
+from service.parser import PESInputFileParser
+from service.plotter import Plotter, PlotterUtils
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class MemoryMonitor:
+    # resident set size of the current process, read from /proc on Linux
+
+    MEGABYTE = 1024 * 1024
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def get_rss(cls) -> int:
+        try:
+            with open("/proc/self/statm", "r") as file:
+                pages = int(file.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            # elsewhere only the peak is available, in kilobytes
+            import resource
+
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @classmethod
+    def to_mb(cls, size: int) -> float:
+        return size / cls.MEGABYTE
+
+
+class BatchJob:
+    # one input file and the image it is rendered to
+    def __init__(self, input_file: str, output_file: str):
+        self._input_file = input_file
+        self._output_file = output_file
+
+    @property
+    def input_file(self) -> str:
+        return self._input_file
+
+    @property
+    def output_file(self) -> str:
+        return self._output_file
+
+    def get_name(self) -> str:
+        return os.path.basename(self.input_file)
+
+    def run(self, template: FigureTemplate, encoder: ImageEncoder) -> None:
+        # every object of the job is local, so nothing outlives it but the files
+        data, options = PESInputFileParser().read_input_file(self.input_file)
+        surface = PES.from_dataframe(data)
+        PESGridEnhancer.enhance_surface(surface)
+        Plotter(
+            surface, self.output_file, options, template=template, encoder=encoder
+        ).plot()
+
+
+def _run_worker(connection: Connection, max_rss: int, encoder_kwargs: dict) -> None:
+    # renders jobs until told to stop, or until its memory passes the ceiling
+    template = Plotter.create_template()
+    encoder = ImageEncoder(**encoder_kwargs)
+    try:
+        while True:
+            job = connection.recv()
+            if job is None:
+                break
+            before = MemoryMonitor.get_rss()
+            start = time.perf_counter()
+            result = {"file": job.get_name(), "status": "ok", "error": ""}
+            try:
+                job.run(template, encoder)
+            except (Exception, SystemExit) as e:
+                # the parser exits on a missing file, keep the worker for the next job
+                result.update({"status": "error", "error": str(e) or type(e).__name__})
+            # matplotlib artists hold reference cycles, free them before measuring
+            gc.collect()
+            rss = MemoryMonitor.get_rss()
+            result.update(
+                {
+                    "seconds": time.perf_counter() - start,
+                    "rss_mb": MemoryMonitor.to_mb(rss),
+                    "delta_mb": MemoryMonitor.to_mb(rss - before),
+                    "pid": os.getpid(),
+                    "recycle": 0 < max_rss < rss,
+                }
+            )
+            connection.send(result)
+            if result["recycle"]:
+                break
+    finally:
+        encoder.close()
+        template.close()
+        PlotterUtils.close_all()
+        connection.close()
+
+
+class BatchWorker:
+    # a worker process rendering one job at a time, sent over a pipe
+    def __init__(self, max_rss: int, encoder_kwargs: dict):
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_run_worker, args=(child, max_rss, encoder_kwargs), daemon=True
+        )
+        self._process.start()
+        child.close()
+        self._job: Optional[BatchJob] = None
+
+    @property
+    def connection(self) -> Connection:
+        return self._connection
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    @property
+    def job(self) -> Optional[BatchJob]:
+        return self._job
+
+    def submit(self, job: BatchJob) -> None:
+        self._job = job
+        self.connection.send(job)
+
+    def receive(self) -> dict:
+        try:
+            result = self.connection.recv()
+        except EOFError:
+            # the process died mid-job, e.g. killed by the out of memory killer
+            self._process.join()
+            result = {
+                "file": self.job.get_name(),
+                "status": "crashed",
+                "error": "worker exited with code {}".format(self._process.exitcode),
+                "pid": self.pid,
+                "recycle": True,
+            }
+        self._job = None
+        return result
+
+    def stop(self) -> None:
+        if self._process.is_alive():
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self._process.join()
+        self.connection.close()
+
+
+class BatchRunner:
+    # renders input files in worker processes, replacing any past the memory ceiling
+    def __init__(
+        self,
+        max_rss_mb: float = 0,
+        workers: int = 1,
+        encoder_kwargs: Optional[dict] = None,
+    ):
+        self._max_rss = int(max_rss_mb * MemoryMonitor.MEGABYTE)
+        self._workers = max(1, workers)
+        self._encoder_kwargs = {} if encoder_kwargs is None else encoder_kwargs
+        self._recycled = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def recycled(self) -> int:
+        return self._recycled
+
+    def create_worker(self) -> BatchWorker:
+        return BatchWorker(self._max_rss, self._encoder_kwargs)
+
+    @classmethod
+    def log_result(cls, result: dict) -> None:
+        if result["status"] != "ok":
+            logger.error(
+                "Error processing file: {} {}".format(result["file"], result["error"])
+            )
+        if "rss_mb" in result:
+            logger.info(
+                "{} {} in {:.2f}s, worker {} RSS {:.1f} MB ({:+.1f} MB)".format(
+                    result["file"],
+                    result["status"],
+                    result["seconds"],
+                    result["pid"],
+                    result["rss_mb"],
+                    result["delta_mb"],
+                )
+            )
+
+    def run(self, jobs: list[BatchJob]) -> list[dict]:
+        pending = deque(jobs)
+        active: dict[Connection, BatchWorker] = {}
+        results = []
+        start = time.perf_counter()
+        for _ in range(min(self.workers, len(pending))):
+            worker = self.create_worker()
+            worker.submit(pending.popleft())
+            active[worker.connection] = worker
+
+        try:
+            while len(active) > 0:
+                for connection in wait(list(active.keys())):
+                    worker = active.pop(connection)
+                    result = worker.receive()
+                    self.log_result(result)
+                    results.append(result)
+                    if result["recycle"]:
+                        logger.info(
+                            "Recycling worker {} after {}".format(
+                                worker.pid, result["file"]
+                            )
+                        )
+                        worker.stop()
+                        self._recycled += 1
+                        worker = self.create_worker() if len(pending) > 0 else None
+                    if worker is None:
+                        continue
+                    if len(pending) > 0:
+                        worker.submit(pending.popleft())
+                        active[worker.connection] = worker
+                    else:
+                        worker.stop()
+        finally:
+            for worker in active.values():
+                worker.stop()
+
+        failed = sum(result["status"] != "ok" for result in results)
+        peak = max((result.get("rss_mb", 0) for result in results), default=0)
+        logger.info(
+            "Rendered {} of {} files in {:.2f}s, peak worker RSS {:.1f} MB, "
+            "{} workers recycled".format(
+                len(results) - failed,
+                len(results),
+                time.perf_counter() - start,
+                peak,
+                self.recycled,
+            )
+        )
+        return results
+
+    @classmethod
+    def write(cls, results: list[dict], filename: str) -> pd.DataFrame:
+        report = pd.DataFrame(results)
+        logger.info("Writing batch report to {}".format(filename))
+        report.to_csv(filename, index=False)
+        return report
@@ -0,0 +1,80 @@
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import matplotlib
+import numpy as np
+from matplotlib.colors import Colormap, LinearSegmentedColormap, to_rgba
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class ColormapRegistry:
+    # matplotlib colormaps or comma separated gradients, with cached color tables
+
+    # sub-ranges historically applied to some maps to avoid very light colors
+    DEFAULT_RANGES = {"winter": (0.5, 1.0), "hsv": (0.2, 0.8)}
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def get_supported_colormaps(cls) -> list[str]:
+        return sorted(matplotlib.colormaps)
+
+    @classmethod
+    def is_gradient(cls, name: str) -> bool:
+        return "," in name
+
+    @classmethod
+    def resolve_name(cls, name: str) -> Optional[str]:
+        # canonical name, matched case-insensitively, or None if unknown
+        name = name.strip()
+        if cls.is_gradient(name):
+            try:
+                [to_rgba(color.strip()) for color in name.split(",")]
+            except ValueError:
+                return None
+            return ",".join(color.strip() for color in name.split(","))
+        if name in matplotlib.colormaps:
+            return name
+        matches = [x for x in matplotlib.colormaps if x.lower() == name.lower()]
+        return matches[0] if len(matches) > 0 else None
+
+    @classmethod
+    def get_colormap(cls, name: str) -> Colormap:
+        if cls.is_gradient(name):
+            return LinearSegmentedColormap.from_list(name, name.split(","))
+        return matplotlib.colormaps[name]
+
+    @classmethod
+    def get_range(
+        cls, name: str, crange: Optional[Tuple[float, float]] = None
+    ) -> Tuple[float, float]:
+        if crange is not None:
+            return crange
+        return cls.DEFAULT_RANGES.get(name, (0.0, 1.0))
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def sample(cls, name: str, n: int, crange: Tuple[float, float]) -> np.ndarray:
+        logger.info(
+            "Sampling {} colors from colormap {} over {}".format(n, name, crange)
+        )
+        colors = cls.get_colormap(name)(np.linspace(crange[0], crange[1], n))
+        colors.setflags(write=False)
+        return colors
+
+    @classmethod
+    def colors(
+        cls,
+        name: Optional[str],
+        n: int,
+        crange: Optional[Tuple[float, float]] = None,
+    ) -> np.ndarray:
+        # read-only (n, 4) RGBA rows, all black without a colormap
+        if name is None:
+            return np.tile(to_rgba("k"), (n, 1))
+        return cls.sample(name, n, cls.get_range(name, crange))
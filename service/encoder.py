@@ -0,0 +1,196 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import matplotlib
+import numpy as np
+from PIL import Image, PngImagePlugin
+
+from service.logging import Log
+from service.style import GlobalStyle
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class RGBABuffer(io.RawIOBase):
+    # keeps savefig(format="rgba") output as an array, so no image size is needed
+    def __init__(self):
+        super().__init__()
+        self._pixels = None
+
+    @property
+    def pixels(self) -> Optional[np.ndarray]:
+        return self._pixels
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: any) -> int:
+        # the renderer passes its buffer, which is copied before it is reused
+        self._pixels = np.array(data, dtype=np.uint8)
+        return self._pixels.nbytes
+
+
+class ImageEncoder:
+    # renders once to RGBA and encodes with PIL, optionally on background threads
+
+    FORMATS = {".png": "PNG", ".webp": "WEBP", ".jpg": "JPEG", ".jpeg": "JPEG"}
+    DEFAULT_FORMAT = "PNG"
+    VECTOR_FORMATS = {".svg": "svg", ".pdf": "pdf"}
+    # encoded images waiting to be written per thread, bounding the memory held
+    PENDING_PER_THREAD = 2
+
+    def __init__(
+        self,
+        compression: Optional[int] = None,
+        palette: Optional[int] = None,
+        quality: Optional[int] = None,
+        threads: int = 0,
+    ):
+        self._compression = compression
+        self._palette = palette
+        self._quality = quality
+        self._threads = max(0, threads)
+        self._executor = None
+        self._pending: deque[tuple[str, Future]] = deque()
+        self._failed = 0
+        if self._threads > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._threads, thread_name_prefix="encoder"
+            )
+
+    @property
+    def threads(self) -> int:
+        return self._threads
+
+    @property
+    def failed(self) -> int:
+        return self._failed
+
+    @classmethod
+    def get_format(cls, filename: str) -> str:
+        # other extensions keep the previous behaviour of writing PNG data
+        extension = os.path.splitext(filename)[1].lower()
+        return cls.FORMATS.get(extension, cls.DEFAULT_FORMAT)
+
+    @classmethod
+    def is_vector_output(cls, filename: str) -> bool:
+        return os.path.splitext(filename)[1].lower() in cls.VECTOR_FORMATS
+
+    @classmethod
+    def render(cls, figure: any, dpi: int) -> np.ndarray:
+        buffer = RGBABuffer()
+        figure.savefig(buffer, bbox_inches="tight", format="rgba", dpi=dpi)
+        return buffer.pixels
+
+    def get_settings(self, settings: GlobalStyle) -> tuple[int, int, int]:
+        # overrides given for the run replace the values of the input file
+        return (
+            settings.compression if self._compression is None else self._compression,
+            settings.palette if self._palette is None else self._palette,
+            settings.quality if self._quality is None else self._quality,
+        )
+
+    @classmethod
+    def to_image(cls, pixels: np.ndarray, image_format: str, palette: int) -> any:
+        image = Image.fromarray(pixels, mode="RGBA")
+        if image_format == "JPEG":
+            background = Image.new("RGBA", image.size, "white")
+            return Image.alpha_composite(background, image).convert("RGB")
+        if image_format == "PNG" and palette > 0:
+            # diagrams use few colors, indexed images are smaller and faster to compress
+            if pixels[..., 3].min() == 255:
+                image = image.convert("RGB")
+            return image.quantize(
+                colors=palette,
+                method=Image.Quantize.FASTOCTREE,
+                dither=Image.Dither.NONE,
+            )
+        return image
+
+    @classmethod
+    def get_save_options(
+        cls, image_format: str, dpi: int, compression: int, quality: int
+    ) -> dict:
+        if image_format == "PNG":
+            info = PngImagePlugin.PngInfo()
+            info.add_text(
+                "Software",
+                "Matplotlib version{}, https://matplotlib.org/".format(
+                    matplotlib.__version__
+                ),
+            )
+            return {"compress_level": compression, "dpi": (dpi, dpi), "pnginfo": info}
+        if image_format == "WEBP":
+            # compression 0-9 maps onto the WebP speed/size trade-off 0-6
+            return {
+                "quality": quality,
+                "lossless": quality == 100,
+                "method": round(compression * 6 / 9),
+            }
+        return {"quality": quality, "dpi": (dpi, dpi)}
+
+    @classmethod
+    def write(
+        cls,
+        pixels: np.ndarray,
+        filename: str,
+        image_format: str,
+        palette: int,
+        options: dict,
+    ) -> str:
+        cls.to_image(pixels, image_format, palette).save(
+            filename, format=image_format, **options
+        )
+        return filename
+
+    def encode(
+        self, figure: any, filename: str, dpi: int, settings: GlobalStyle
+    ) -> None:
+        if self.is_vector_output(filename):
+            # vector files hold the figure's artists, so they are written in line
+            extension = os.path.splitext(filename)[1].lower()
+            figure.savefig(
+                filename,
+                bbox_inches="tight",
+                format=self.VECTOR_FORMATS[extension],
+                dpi=dpi,
+            )
+            return None
+        compression, palette, quality = self.get_settings(settings)
+        image_format = self.get_format(filename)
+        pixels = self.render(figure, dpi)
+        options = self.get_save_options(image_format, dpi, compression, quality)
+        if self._executor is None:
+            self.write(pixels, filename, image_format, palette, options)
+            return None
+
+        while len(self._pending) >= self.threads * self.PENDING_PER_THREAD:
+            self.collect(*self._pending.popleft())
+        future = self._executor.submit(
+            self.write, pixels, filename, image_format, palette, options
+        )
+        self._pending.append((filename, future))
+
+    def collect(self, filename: str, future: Future) -> None:
+        try:
+            future.result()
+        except Exception as e:
+            self._failed += 1
+            logger.error("Error encoding image: {} {}".format(filename, e))
+
+    def close(self) -> None:
+        # waits for every queued image to be written
+        while len(self._pending) > 0:
+            self.collect(*self._pending.popleft())
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
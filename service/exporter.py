@@ -0,0 +1,146 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from domain.pes import PES
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class CurveExporter:
+    # buffers points and curves of many surfaces, written in one pass
+
+    FORMATS = [".npz", ".csv", ".parquet"]
+    PARQUET_ENGINES = ["pyarrow", "fastparquet"]
+
+    def __init__(self):
+        self._points: dict[str, list] = {
+            "surface": [],
+            "name": [],
+            "type": [],
+            "energy": [],
+            "rxn_coord": [],
+        }
+        self._reactions: dict[str, list] = {
+            "surface": [],
+            "ts": [],
+            "reactant": [],
+            "product": [],
+        }
+        self._x: list[np.ndarray] = []
+        self._y: list[np.ndarray] = []
+        self._surfaces = 0
+
+    @property
+    def surfaces(self) -> int:
+        return self._surfaces
+
+    def add(self, name: str, surface: PES) -> None:
+        for sp in surface.get_stationary_points():
+            self._points["surface"].append(name)
+            self._points["name"].append(sp.name)
+            self._points["type"].append(sp.sptype)
+            self._points["energy"].append(sp.energy)
+            self._points["rxn_coord"].append(sp.rxn_coord)
+        for rxn in surface.reactions:
+            self._reactions["surface"].append(name)
+            self._reactions["ts"].append(rxn.ts.name)
+            self._reactions["reactant"].append(rxn.reac.name)
+            self._reactions["product"].append(rxn.prod.name)
+        if len(surface.reactions) > 0:
+            self._x.append(np.stack([rxn.x_coords for rxn in surface.reactions]))
+            self._y.append(np.stack([rxn.y_coords for rxn in surface.reactions]))
+        self._surfaces += 1
+
+    def get_curves(self) -> tuple[np.ndarray, np.ndarray]:
+        if len(self._x) == 0:
+            return np.empty((0, 0)), np.empty((0, 0))
+        return np.concatenate(self._x), np.concatenate(self._y)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        x, y = self.get_curves()
+        arrays = {"sp_" + key: np.array(values) for key, values in self._points.items()}
+        # unconnected minima have no reaction coordinate, stored as nan
+        arrays["sp_energy"] = np.array(self._points["energy"], dtype=float)
+        arrays["sp_rxn_coord"] = np.array(self._points["rxn_coord"], dtype=float)
+        arrays.update(
+            {"rxn_" + key: np.array(values) for key, values in self._reactions.items()}
+        )
+        arrays["rxn_x"] = x
+        arrays["rxn_y"] = y
+        return arrays
+
+    def to_dataframe(self) -> pd.DataFrame:
+        points = pd.DataFrame(
+            {
+                "surface": self._points["surface"],
+                "record": "stationary_point",
+                "name": self._points["name"],
+                "type": self._points["type"],
+                "reactant": None,
+                "product": None,
+                "index": 0,
+                "x": np.array(self._points["rxn_coord"], dtype=float),
+                "y": np.array(self._points["energy"], dtype=float),
+            }
+        )
+        x, y = self.get_curves()
+        n_points = x.shape[1] if x.ndim == 2 else 0
+
+        def repeat(values: list) -> np.ndarray:
+            return np.repeat(np.array(values, dtype=object), n_points)
+
+        curves = pd.DataFrame(
+            {
+                "surface": repeat(self._reactions["surface"]),
+                "record": "curve",
+                "name": repeat(self._reactions["ts"]),
+                "type": "TS",
+                "reactant": repeat(self._reactions["reactant"]),
+                "product": repeat(self._reactions["product"]),
+                "index": np.tile(np.arange(n_points), x.shape[0]),
+                "x": x.ravel(),
+                "y": y.ravel(),
+            }
+        )
+        return pd.concat([points, curves], ignore_index=True)
+
+    @classmethod
+    def check_format(cls, filename: str) -> None:
+        ext = os.path.splitext(filename)[-1].lower()
+        if ext not in cls.FORMATS:
+            raise ValueError(
+                "Unsupported export format {}, use one of {}".format(
+                    ext, ", ".join(cls.FORMATS)
+                )
+            )
+        if ext == ".parquet" and not any(
+            importlib.util.find_spec(engine) is not None
+            for engine in cls.PARQUET_ENGINES
+        ):
+            raise ValueError(
+                "Parquet export requires {}, or use .npz or .csv".format(
+                    " or ".join(cls.PARQUET_ENGINES)
+                )
+            )
+
+    def write(self, filename: str) -> None:
+        self.check_format(filename)
+        ext = os.path.splitext(filename)[-1].lower()
+        logger.info(
+            "Exporting {} stationary points and {} curves from {} surfaces to {}".format(
+                len(self._points["name"]),
+                len(self._reactions["ts"]),
+                self.surfaces,
+                filename,
+            )
+        )
+        if ext == ".npz":
+            np.savez_compressed(filename, **self.to_arrays())
+        elif ext == ".csv":
+            self.to_dataframe().to_csv(filename, index=False)
+        else:
+            self.to_dataframe().to_parquet(filename, index=False)
@@ -0,0 +1,68 @@
+import os
+
+import matplotlib.pyplot as plt
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class FigureTemplate:
+    # one figure reused by every job, cleared of the previous job's artists
+    def __init__(
+        self,
+        xlabel: str = "x",
+        ylabel: str = "y",
+        title: str = "title",
+    ):
+        figure, axis = plt.subplots()
+        axis.set_ylabel(ylabel)
+        axis.set_xlabel(xlabel)
+        axis.set_title(title)
+        figure.tight_layout()
+        self._figure = figure
+        self._axis = axis
+        self._jobs = 0
+
+    @property
+    def figure(self) -> any:
+        return self._figure
+
+    @property
+    def axis(self) -> any:
+        return self._axis
+
+    @property
+    def jobs(self) -> int:
+        return self._jobs
+
+    def acquire(self) -> tuple[any, any]:
+        self.release()
+        self._jobs += 1
+        plt.figure(self.figure.number)
+        return self.figure, self.axis
+
+    def release(self) -> None:
+        axis = self.axis
+        artists = (
+            list(axis.lines)
+            + list(axis.collections)
+            + list(axis.texts)
+            + list(axis.images)
+            + list(axis.patches)
+            + list(axis.artists)
+            + list(axis.tables)
+        )
+        for artist in artists:
+            artist.remove()
+        if axis.get_legend() is not None:
+            axis.get_legend().remove()
+        axis.relim()
+        axis.set_aspect("auto")
+        axis.set_autoscale_on(True)
+        axis.autoscale_view()
+
+    def close(self) -> None:
+        logger.info("Closing figure template after {} jobs".format(self.jobs))
+        self.release()
+        plt.close(self.figure)
@@ -0,0 +1,51 @@
+import os
+from functools import lru_cache
+
+from matplotlib import font_manager
+from matplotlib.font_manager import FontProperties
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class FontRegistry:
+    # unknown families fall back to DejaVu Sans, so matplotlib never searches or warns
+
+    FALLBACK = "DejaVu Sans"
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def get_font_names(cls) -> tuple[str, ...]:
+        names = tuple(sorted(font_manager.fontManager.get_font_names()))
+        logger.info("Indexed {} font families".format(len(names)))
+        return names
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def get_index(cls) -> dict[str, str]:
+        # lower-cased name -> family, plus generic families such as "serif"
+        index = {name.lower(): name for name in cls.get_font_names()}
+        index.update({name: name for name in font_manager.font_family_aliases})
+        return index
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def resolve(cls, family: str) -> str:
+        # each unknown family is only reported once
+        resolved = cls.get_index().get(family.strip().lower())
+        if resolved is None:
+            logger.warning(
+                "Font {} not found, falling back to {}".format(family, cls.FALLBACK)
+            )
+            return cls.FALLBACK
+        return resolved
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def get_properties(cls, family: str) -> FontProperties:
+        # a bare string would be parsed as a fontconfig pattern, breaking on "-"
+        return FontProperties(family=[cls.resolve(family)])
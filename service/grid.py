@@ -18,7 +18,18 @@ class PESGridEnhancer:
     @classmethod
     def enhance_surface(cls, surface: PES) -> None:
         cls.assign_stationary_point_rxn_coordinates(surface)
-        [cls.generate_reaction_curve(rxn) for rxn in surface.reactions]
+        Log.log_items(
+            logger,
+            "Generating potential energy curves for reaction",
+            (rxn.get_name() for rxn in surface.reactions),
+        )
+        if len(surface.methods) > 0:
+            [
+                cls.generate_method_curves(rxn, surface.methods)
+                for rxn in surface.reactions
+            ]
+        else:
+            [cls.generate_reaction_curve(rxn) for rxn in surface.reactions]
 
     @classmethod
     def assign_stationary_point_rxn_coordinates(cls, surface: PES):
@@ -53,11 +64,34 @@ class PESGridEnhancer:
 
     @classmethod
     def generate_reaction_curve(cls, rxn: Reaction):
-        logger.info(
-            "Generating potential energy curves for reaction {}".format(rxn.get_name())
+        energies = np.array([[sp.energy] for sp in rxn.get_stationary_points()])
+        x, v = cls.generate_reaction_curves(rxn, energies)
+        rxn.x_coords = x
+        rxn.y_coords = v[:, 0]
+
+    @classmethod
+    def generate_method_curves(cls, rxn: Reaction, methods: list[str]):
+        # one pass generates the curves of every method, the layout is shared
+        energies = np.array(
+            [[sp.energies[m] for m in methods] for sp in rxn.get_stationary_points()]
+        )
+        x, v = cls.generate_reaction_curves(rxn, energies)
+        rxn.x_coords = x
+        rxn.series = {method: v[:, k] for k, method in enumerate(methods)}
+        rxn.y_coords = rxn.series[methods[0]]
+
+    @classmethod
+    def generate_reaction_curves(
+        cls, rxn: Reaction, energies: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # (3, n) reactant, TS and product energies, one column per method
+        reac, ts, prod = energies
+        xi, vi = cls.generate_reaction_curve_component(
+            rxn.reac.rxn_coord, reac, rxn.ts.rxn_coord, ts
+        )
+        xj, vj = cls.generate_reaction_curve_component(
+            rxn.prod.rxn_coord, prod, rxn.ts.rxn_coord, ts
         )
-        xi, vi = cls.generate_reaction_curve_component(rxn.reac, rxn.ts)
-        xj, vj = cls.generate_reaction_curve_component(rxn.prod, rxn.ts)
 
         x, v = np.concatenate((xi, xj)), np.concatenate((vi, vj))
         isort = np.argsort(x)
@@ -65,44 +99,32 @@ class PESGridEnhancer:
         x, v = cls.remove_duplicates(x, v)
 
         # interpolate
-        f_interp = interp1d(x, v, kind="cubic", fill_value="extrapolate")
+        f_interp = interp1d(x, v, kind="cubic", fill_value="extrapolate", axis=0)
         x = np.linspace(np.min(x), np.max(x), 100)
         v = f_interp(x)
-
-        rxn.x_coords = x
-        rxn.y_coords = v
+        return x, v
 
     @classmethod
     def generate_reaction_curve_component(
-        cls, i: StationaryPoint, j: StationaryPoint
+        cls, xi: float, ei: np.ndarray, xj: float, ej: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
         def generate_component(
-            xi: float, yi: float, xj: float, yj: float
+            xi: float, yi: np.ndarray, xj: float, yj: np.ndarray
         ) -> Tuple[np.ndarray, np.ndarray]:
 
             # Solve for quadratic coefficients: V(x) = ax^2 + bx + c
             a = np.array([[xi**2, xi, 1], [xj**2, xj, 1], [(2 * xi), 1, 0]])
-            b = np.array([yi, yj, 0])
+            b = np.array([yi, yj, np.zeros_like(yi)])
             coeff = np.linalg.solve(a, b)
 
-            # Generate the smooth potential
+            # Generate the smooth potential, one column per energy
             x = np.linspace(xi, xj, 25)
-            v = coeff[0] * x**2 + coeff[1] * x + coeff[2]
+            v = coeff[0] * x[:, None] ** 2 + coeff[1] * x[:, None] + coeff[2]
             return x, v
 
         # generate two harmonic curves, from reac to midpoint, and midpoint to ts
-        xa, va = generate_component(
-            i.rxn_coord,
-            i.energy,
-            0.5 * (i.rxn_coord + j.rxn_coord),
-            0.5 * (i.energy + j.energy),
-        )
-        xb, vb = generate_component(
-            j.rxn_coord,
-            j.energy,
-            0.5 * (i.rxn_coord + j.rxn_coord),
-            0.5 * (i.energy + j.energy),
-        )
+        xa, va = generate_component(xi, ei, 0.5 * (xi + xj), 0.5 * (ei + ej))
+        xb, vb = generate_component(xj, ej, 0.5 * (xi + xj), 0.5 * (ei + ej))
         return np.concatenate((xa, xb)), np.concatenate((va, vb))
 
     @classmethod
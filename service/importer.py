@@ -0,0 +1,271 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import pandas as pd
+
+from domain.pes import PES
+from service.logging import Log
+from service.parser import PlainTextParser
+from service.writer import PlainTextWriter
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class EnergyReader:
+    # final energies in Hartree, read from the tail of each output
+
+    HARTREE_TO_KJ_MOL = 2625.4996
+    TAIL_BYTES = 64 * 1024
+
+    NUMBER = r"(-?\d+\.\d+(?:[eEdD][-+]?\d+)?)"
+    PATTERNS = {
+        "electronic": {
+            "gaussian": re.compile(r"SCF Done:\s+E\(\S+\)\s+=\s+" + NUMBER),
+            "orca": re.compile(r"FINAL SINGLE POINT ENERGY\s+" + NUMBER),
+        },
+        "free": {
+            "gaussian": re.compile(
+                r"Sum of electronic and thermal Free Energies=\s+" + NUMBER
+            ),
+            "orca": re.compile(r"Final Gibbs free energy\s+\.+\s+" + NUMBER),
+        },
+    }
+    XYZ_ENERGY = re.compile(r"(?:energy|E)\s*[:=]\s*" + NUMBER, re.IGNORECASE)
+    XYZ_NUMBER = re.compile(NUMBER)
+    EXTENSIONS = [".log", ".out", ".xyz"]
+    KINDS = ["electronic", "free"]
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def read_tail(cls, filename: str, size: int) -> tuple[str, bool]:
+        # the last size bytes of a file and whether that is all of it
+        with open(filename, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            length = file.tell()
+            file.seek(max(0, length - size))
+            return file.read().decode("utf-8", errors="replace"), size >= length
+
+    @classmethod
+    def to_float(cls, value: str) -> float:
+        # Fortran style exponents, e.g. -0.1D+01
+        return float(value.replace("D", "E").replace("d", "e"))
+
+    @classmethod
+    def read_output(cls, filename: str, kind: str) -> float:
+        patterns = cls.PATTERNS[kind]
+        size = cls.TAIL_BYTES
+        while True:
+            tail, complete = cls.read_tail(filename, size)
+            for pattern in patterns.values():
+                matches = pattern.findall(tail)
+                if len(matches) > 0:
+                    return cls.to_float(matches[-1])
+            if complete:
+                raise ValueError(
+                    "No {} energy found in {}".format(kind, os.path.basename(filename))
+                )
+            size *= 4
+
+    @classmethod
+    def read_xyz(cls, filename: str) -> float:
+        # the comment line of the last frame holds its energy
+        with open(filename, "r") as file:
+            atoms = int(file.readline().split()[0])
+        size = cls.TAIL_BYTES
+        while True:
+            tail, complete = cls.read_tail(filename, size)
+            lines = tail.rstrip().splitlines()
+            if len(lines) >= atoms + 2 or complete:
+                break
+            size *= 4
+        if len(lines) < atoms + 1:
+            raise ValueError("Truncated xyz file {}".format(filename))
+        comment = lines[-(atoms + 1)]
+        match = cls.XYZ_ENERGY.search(comment) or cls.XYZ_NUMBER.search(comment)
+        if match is None:
+            raise ValueError("No energy in xyz comment of {}".format(filename))
+        return cls.to_float(match.group(1))
+
+    @classmethod
+    def read(cls, filename: str, kind: str = "electronic") -> float:
+        if filename.lower().endswith(".xyz"):
+            if kind != "electronic":
+                raise ValueError("xyz files only hold electronic energies")
+            return cls.read_xyz(filename)
+        return cls.read_output(filename, kind)
+
+
+def _read_energy(filename: str, kind: str) -> tuple[str, Optional[float], str]:
+    # runs in a worker process, errors are returned rather than raised
+    try:
+        return filename, EnergyReader.read(filename, kind), ""
+    except (Exception, SystemExit) as e:
+        return filename, None, str(e) or type(e).__name__
+
+
+class PESImporter:
+    # species are read from the output named after them, unless a file column is given
+
+    COLUMNS = ["name", "type", "reactant", "product"]
+
+    def __init__(
+        self,
+        directory: str,
+        mapping_file: str,
+        kind: str = "electronic",
+        reference: Optional[str] = None,
+        workers: int = 1,
+    ):
+        self._directory = directory
+        self._mapping_file = mapping_file
+        self._kind = kind
+        self._reference = reference
+        self._workers = max(1, workers)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def read_mapping(self) -> pd.DataFrame:
+        lines = [
+            line.split()
+            for line in PlainTextParser(self._mapping_file).read()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        header = lines[0]
+        # the optional file column may be left out on any row
+        rows = [row + ["nan"] * (len(header) - len(row)) for row in lines[1:]]
+        mapping = pd.DataFrame(rows, columns=header)
+        missing = [x for x in self.COLUMNS if x not in mapping.columns]
+        if len(missing) > 0:
+            raise ValueError(
+                "Mapping file {} is missing columns {}".format(
+                    self._mapping_file, ", ".join(missing)
+                )
+            )
+        minima = set(mapping[mapping["type"] == "MIN"]["name"])
+        for row in mapping[mapping["type"] == "TS"].itertuples():
+            for species in [row.reactant, row.product]:
+                if species not in minima:
+                    raise ValueError(
+                        "Transition state {} connects unknown minimum {}".format(
+                            row.name, species
+                        )
+                    )
+        return mapping
+
+    def find_outputs(self) -> dict[str, str]:
+        # keyed on the lower case name, so M1 finds m1.log
+        outputs = {}
+        for entry in sorted(os.scandir(self.directory), key=lambda x: x.name):
+            stem, ext = os.path.splitext(entry.name)
+            if entry.is_file() and ext.lower() in EnergyReader.EXTENSIONS:
+                outputs.setdefault(stem.lower(), entry.path)
+        return outputs
+
+    def get_files(self, mapping: pd.DataFrame) -> dict[str, list[str]]:
+        outputs = self.find_outputs()
+        files = {}
+        for row in mapping.itertuples():
+            if "file" in mapping.columns and row.file != "nan":
+                names = row.file.split("+")
+                files[row.name] = [os.path.join(self.directory, x) for x in names]
+            elif row.name.lower() in outputs:
+                files[row.name] = [outputs[row.name.lower()]]
+            else:
+                raise ValueError("No output file found for {}".format(row.name))
+        return files
+
+    def read_energies(self, files: list[str]) -> dict[str, float]:
+        logger.info(
+            "Reading {} energies from {} files with {} workers".format(
+                self.kind, len(files), self.workers
+            )
+        )
+        if self.workers == 1 or len(files) == 1:
+            results = [_read_energy(file, self.kind) for file in files]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(
+                    pool.map(
+                        _read_energy,
+                        files,
+                        [self.kind] * len(files),
+                        chunksize=max(1, len(files) // (4 * self.workers)),
+                    )
+                )
+
+        errors = [(file, error) for file, energy, error in results if energy is None]
+        for file, error in errors:
+            logger.error("Error reading {}: {}".format(file, error))
+        if len(errors) > 0:
+            raise ValueError("Could not read {} output files".format(len(errors)))
+        return {file: energy for file, energy, _ in results}
+
+    def get_dataframe(self) -> pd.DataFrame:
+        mapping = self.read_mapping()
+        files = self.get_files(mapping)
+        energies = self.read_energies(sorted({x for v in files.values() for x in v}))
+        hartree = {name: sum(energies[f] for f in v) for name, v in files.items()}
+
+        reference = self._reference
+        if reference is None:
+            reference = mapping[mapping["type"] == "MIN"]["name"].iloc[0]
+        if reference not in hartree:
+            raise ValueError("Unknown reference species {}".format(reference))
+        logger.info("Energies are relative to {}".format(reference))
+
+        data = mapping[self.COLUMNS].copy()
+        data.insert(
+            1,
+            "energy",
+            [
+                round(
+                    (hartree[name] - hartree[reference])
+                    * EnergyReader.HARTREE_TO_KJ_MOL,
+                    2,
+                )
+                for name in data["name"]
+            ],
+        )
+        return data
+
+    def get_surface(self) -> PES:
+        return PES.from_dataframe(self.get_dataframe())
+
+    @classmethod
+    def to_lines(cls, data: pd.DataFrame) -> list[str]:
+        widths = [
+            max(len(str(x)) for x in [column] + list(data[column])) + 4
+            for column in data.columns
+        ]
+        rows = [list(data.columns)] + data.astype(str).values.tolist()
+        table = [
+            "".join(str(x).ljust(w) for x, w in zip(row, widths)).rstrip()
+            for row in rows
+        ]
+        return ["section: pes"] + table + ["", "section: global", ""]
+
+    def write(self, filename: str) -> PES:
+        data = self.get_dataframe()
+        # the surface is built first so a bad mapping fails before writing
+        surface = PES.from_dataframe(data)
+        PlainTextWriter(self.to_lines(data)).write(filename)
+        logger.info(
+            "Imported {} minima, {} transition states and {} reactions".format(
+                len(surface.minima), len(surface.ts), len(surface.reactions)
+            )
+        )
+        return surface
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from domain.pes import PES, Reaction, StationaryPoint
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class ReactionChannel:
+    # all reactions between the same pair of minima, lowest barrier first
+    def __init__(self, reactions: list[Reaction], indices: list[int]):
+        # indices are positions in PES.reactions, used to look up compiled styles
+        order = sorted(range(len(reactions)), key=lambda i: reactions[i].ts.energy)
+        self._reactions = [reactions[i] for i in order]
+        self._indices = [indices[i] for i in order]
+
+    @property
+    def reactions(self) -> list[Reaction]:
+        return self._reactions
+
+    @property
+    def indices(self) -> list[int]:
+        return self._indices
+
+    @property
+    def lowest(self) -> Reaction:
+        return self._reactions[0]
+
+    @property
+    def lowest_index(self) -> int:
+        return self._indices[0]
+
+    @property
+    def hidden(self) -> list[Reaction]:
+        return self._reactions[1:]
+
+    def get_envelope(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # channels share both end points, so their curves share an x grid
+        y = np.stack([rxn.y_coords for rxn in self.reactions])
+        return self.lowest.x_coords, np.min(y, axis=0), np.max(y, axis=0)
+
+
+class ReactionLOD:
+    # groups parallel reactions into channels drawn as a single curve
+    def __init__(self):
+        pass
+
+    @classmethod
+    def single_channels(cls, surface: PES) -> list[ReactionChannel]:
+        return [ReactionChannel([rxn], [i]) for i, rxn in enumerate(surface.reactions)]
+
+    @classmethod
+    def group_channels(cls, surface: PES) -> list[ReactionChannel]:
+        groups: dict[tuple[str, str], list[int]] = {}
+        for i, rxn in enumerate(surface.reactions):
+            key = tuple(sorted((rxn.reac.name, rxn.prod.name)))
+            groups.setdefault(key, []).append(i)
+        return [
+            ReactionChannel([surface.reactions[i] for i in indices], indices)
+            for indices in groups.values()
+        ]
+
+    @classmethod
+    def reduce(
+        cls, surface: PES, min_channels: int = 2, min_reactions: int = 0
+    ) -> list[ReactionChannel]:
+        if len(surface.reactions) < min_reactions:
+            return cls.single_channels(surface)
+
+        channels = []
+        for channel in cls.group_channels(surface):
+            if len(channel.reactions) >= min_channels:
+                channels.append(channel)
+            else:
+                channels += [
+                    ReactionChannel([rxn], [i])
+                    for rxn, i in zip(channel.reactions, channel.indices)
+                ]
+
+        hidden = sum(len(channel.hidden) for channel in channels)
+        logger.info(
+            "Level of detail: drawing {} of {} reactions ({} hidden)".format(
+                len(channels), len(surface.reactions), hidden
+            )
+        )
+        return channels
+
+    @classmethod
+    def hidden_stationary_points(
+        cls, channels: list[ReactionChannel]
+    ) -> set[StationaryPoint]:
+        return {rxn.ts for channel in channels for rxn in channel.hidden}
@@ -1,4 +1,10 @@
+import atexit
 import logging
+import multiprocessing.util
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Optional
 
 
 def title():
@@ -11,26 +17,100 @@ def title():
 
 
 class Log:
+    # records are written by a QueueListener thread, off the render path
+
+    LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+    # above this many items, per-item messages are summarised in one line
+    SUMMARY_THRESHOLD = 25
+    SUMMARY_PREVIEW = 5
+
+    _level = logging.INFO
+    _handler: Optional[QueueHandler] = None
+    _listener: Optional[QueueListener] = None
+    _loggers: dict[str, logging.Logger] = {}
+
     def __init__(self):
         pass
 
     @classmethod
-    def get_logger(cls, name) -> logging.Logger:
-        # Create a logger
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.INFO)
+    def get_handler(cls) -> QueueHandler:
+        if cls._handler is None:
+            cls._handler = QueueHandler(queue.SimpleQueue())
+            cls.start()
+            atexit.register(cls.stop)
+            os.register_at_fork(after_in_child=cls.restart)
+        return cls._handler
 
-        # Create console handler
+    @classmethod
+    def start(cls) -> None:
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-
-        # Create formatter and add it to the handler
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        console_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
         )
-        console_handler.setFormatter(formatter)
+        cls._listener = QueueListener(cls._handler.queue, console_handler)
+        cls._listener.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        # drains any queued records before the process exits
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
 
-        # Add the handler to the logger
-        logger.addHandler(console_handler)
+    @classmethod
+    def restart(cls) -> None:
+        # a forked child has no listener thread, and the parent's queue may have
+        # been mid-operation at fork, so the child gets a fresh queue and listener
+        cls._handler.queue = queue.SimpleQueue()
+        cls.start()
+        # pool workers exit without running atexit, but do run these finalizers
+        multiprocessing.util.Finalize(None, cls.stop, exitpriority=0)
 
+    @classmethod
+    def get_logger(cls, name) -> logging.Logger:
+        # idempotent, every call for a name returns the same configured logger
+        if name in cls._loggers:
+            return cls._loggers[name]
+        logger = logging.getLogger(name)
+        logger.setLevel(cls._level)
+        logger.propagate = False
+        logger.addHandler(cls.get_handler())
+        cls._loggers[name] = logger
         return logger
+
+    @classmethod
+    def set_level(cls, level: str | int) -> None:
+        cls._level = (
+            logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        )
+        for logger in cls._loggers.values():
+            logger.setLevel(cls._level)
+
+    @classmethod
+    def log_items(
+        cls,
+        logger: logging.Logger,
+        message: str,
+        items: Iterable[any],
+        level: int = logging.INFO,
+        threshold: Optional[int] = None,
+    ) -> None:
+        # one line per item, or a summary above threshold items
+        if not logger.isEnabledFor(level):
+            return None
+        items = [str(item) for item in items]
+        threshold = cls.SUMMARY_THRESHOLD if threshold is None else threshold
+        if len(items) <= threshold:
+            for item in items:
+                logger.log(level, "{}: {}".format(message, item))
+            return None
+        logger.log(
+            level,
+            "{} ({} items): {}, ... and {} more".format(
+                message,
+                len(items),
+                ", ".join(items[: cls.SUMMARY_PREVIEW]),
+                len(items) - cls.SUMMARY_PREVIEW,
+            ),
+        )
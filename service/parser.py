@@ -1,9 +1,11 @@
+import json
 import os.path
-from typing import Tuple
+from typing import Iterator, Tuple
 
 import pandas as pd
 
 from domain.options import OptionDefinition, OptionsManager
+from domain.pes import PES
 from service.logging import Log
 
 logger = Log.get_logger(os.path.basename(__file__))
@@ -52,7 +54,7 @@ class PESInputFileParser:
                 if file.endswith(".dat")
             ]
         )
-        [logger.info("Found file: {}".format(file)) for file in files]
+        Log.log_items(logger, "Found file", files)
         return files
 
     @classmethod
@@ -94,23 +96,159 @@ class PESInputFileParser:
                     sections[section].append(line)
         return sections
 
-    def read_input_file(self, filename: str) -> Tuple[pd.DataFrame, OptionsManager]:
+    @classmethod
+    def dataframe_from_sections(cls, sections: dict) -> pd.DataFrame:
+        df = pd.DataFrame(
+            [line.split() for line in sections["pes"][1:]],
+            columns=sections["pes"][0].split(),
+        )
+        columns = PES.get_energy_columns(df)
+        if len(columns) == 0:
+            raise ValueError("No energy column in pes section")
+        for column in columns:
+            df[column] = df[column].astype(float)
+        return df
+
+    @classmethod
+    def options_from_sections(cls, sections: dict) -> OptionsManager:
+        reac_opts = PESInputFileParser.process_reaction_format(sections)
+        global_opts = PESInputFileParser.process_global_format_options(sections)
+        opt_mgr = OptionsManager(options=reac_opts + global_opts)
+        opt_mgr.log()
+        return opt_mgr
+
+    def read_sections(self, filename: str) -> dict:
         if os.path.isfile(filename):
             logger.info("Reading input file {}".format(filename))
             self.parser.filename = filename
             content = self.parser.read()
-            sections = self.parse_sections(content)
-
-            df = pd.DataFrame(
-                [line.split() for line in sections["pes"][1:]],
-                columns=sections["pes"][0].split(),
-            )
-            df["energy"] = df["energy"].astype(float)
-            reac_opts = PESInputFileParser.process_reaction_format(sections)
-            global_opts = PESInputFileParser.process_global_format_options(sections)
-            opt_mgr = OptionsManager(options=reac_opts + global_opts)
-            opt_mgr.log()
-            return df, opt_mgr
+            return self.parse_sections(content)
         else:
             logger.fatal("Filename {} is not present".format(filename))
             exit()
+
+    def read_input_file(self, filename: str) -> Tuple[pd.DataFrame, OptionsManager]:
+        sections = self.read_sections(filename)
+        df = self.dataframe_from_sections(sections)
+        return df, self.options_from_sections(sections)
+
+
+class PESBundleParser:
+    # streams named surfaces from a text bundle or JSON Lines file, one at a time
+    def __init__(self, filename: str):
+        self._filename = filename
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @filename.setter
+    def filename(self, filename: str):
+        self._filename = filename
+
+    @classmethod
+    def is_bundle(cls, filename: str) -> bool:
+        return filename.endswith(".jsonl") or filename.endswith(".bundle")
+
+    @classmethod
+    def default_name(cls, index: int) -> str:
+        return "surface-{}".format(index + 1)
+
+    def surfaces(self) -> Iterator[Tuple[str, dict]]:
+        logger.info("Streaming surfaces from bundle {}".format(self.filename))
+        if self.filename.endswith(".jsonl"):
+            yield from self.read_json_lines()
+        else:
+            yield from self.read_text()
+
+    def read_text(self) -> Iterator[Tuple[str, dict]]:
+        name, sections, section, count = None, None, None, 0
+        with open(self.filename, "r") as file:
+            for number, line in enumerate(file, start=1):
+                line = line.rstrip("\n")
+                if "section:" in line:
+                    _, header = line.split(":", 1)
+                    if not header.strip():
+                        logger.warning(
+                            "Ignoring section without a name on line {} of {}".format(
+                                number, self.filename
+                            )
+                        )
+                        section = None
+                        continue
+                    section, *label = header.split(maxsplit=1)
+                    if section == "pes":
+                        if sections is not None:
+                            yield name, sections
+                            count += 1
+                        name = label[0].strip() if label else self.default_name(count)
+                        sections = {}
+                    if sections is None:
+                        logger.warning(
+                            "Ignoring section {} before the first pes section".format(
+                                section
+                            )
+                        )
+                        section = None
+                        continue
+                    sections[section] = []
+                elif (
+                    section is not None
+                    and any(char.isalnum() for char in line)
+                    and line.strip()[0] != "#"
+                ):
+                    sections[section].append(line)
+        if sections is not None:
+            yield name, sections
+
+    def read_json_lines(self) -> Iterator[Tuple[str, dict]]:
+        count = 0
+        with open(self.filename, "r") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.error(
+                        "Skipping invalid JSON on line {} of {}: {}".format(
+                            number, self.filename, e
+                        )
+                    )
+                    continue
+                if not isinstance(record, dict):
+                    logger.error(
+                        "Skipping line {} of {}, not a JSON object".format(
+                            number, self.filename
+                        )
+                    )
+                    continue
+                name = record.pop("name", self.default_name(count))
+                try:
+                    sections = {
+                        section: self.lines_from_json(lines)
+                        for section, lines in record.items()
+                    }
+                except ValueError as e:
+                    logger.error(
+                        "Skipping line {} of {}: {}".format(number, self.filename, e)
+                    )
+                    continue
+                count += 1
+                yield str(name), sections
+
+    @classmethod
+    def lines_from_json(cls, lines: list[any]) -> list[str]:
+        if not isinstance(lines, list):
+            raise ValueError("each section must be a list")
+        # pes rows may also be given as objects keyed on the column names
+        if len(lines) > 0 and all(isinstance(row, dict) for row in lines):
+            columns = list(lines[0].keys())
+            if any(list(row.keys()) != columns for row in lines):
+                raise ValueError("all pes rows must have the same columns")
+            return [" ".join(columns)] + [
+                " ".join(str(row[column]) for column in columns) for row in lines
+            ]
+        if not all(isinstance(line, str) for line in lines):
+            raise ValueError("each section must be a list of strings")
+        return lines
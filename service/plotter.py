@@ -2,15 +2,81 @@ import os
 
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import cm
 
-from domain.options import Option, OptionsManager
-from domain.pes import PES, Reaction, StationaryPoint
+from matplotlib.font_manager import FontProperties
+
+from domain.options import OptionsManager
+from domain.pes import PES, Reaction
+from service.colormap import ColormapRegistry
+from service.encoder import ImageEncoder
+from service.figure import FigureTemplate
+from service.fonts import FontRegistry
+from service.lod import ReactionChannel, ReactionLOD
 from service.logging import Log
+from service.rasterizer import DensityRasterizer
+from service.sink import ImageSink
+from service.style import GlobalStyle, StyleCompiler, StyleTable
+from service.vector import PathSimplifier
+from service.web import WebDocumentWriter
 
 logger = Log.get_logger(os.path.basename(__file__))
 
 
+class Label:
+    # position and appearance of one label, independent of matplotlib
+    def __init__(
+        self,
+        text: str,
+        xy: tuple[float, float],
+        xytext: tuple[float, float],
+        va: str,
+        color: any = "k",
+        fontsize: float = None,
+        arrow: bool = False,
+        box: bool = False,
+    ):
+        self._text = text
+        self._xy = xy
+        self._xytext = xytext
+        self._va = va
+        self._color = color
+        self._fontsize = fontsize
+        self._arrow = arrow
+        self._box = box
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def xy(self) -> tuple[float, float]:
+        return self._xy
+
+    @property
+    def xytext(self) -> tuple[float, float]:
+        return self._xytext
+
+    @property
+    def va(self) -> str:
+        return self._va
+
+    @property
+    def color(self) -> any:
+        return self._color
+
+    @property
+    def fontsize(self) -> float:
+        return self._fontsize
+
+    @property
+    def arrow(self) -> bool:
+        return self._arrow
+
+    @property
+    def box(self) -> bool:
+        return self._box
+
+
 class PlotterUtils:
     @classmethod
     def create_figure(cls, xlabel: str = "x", ylabel: str = "y", title: str = "title"):
@@ -23,48 +89,44 @@ class PlotterUtils:
 
     @classmethod
     def save_image(
-        cls, output_filename: str, figure: any, img_frmt="png", dpi: int = 400
+        cls,
+        output_filename: str,
+        figure: any,
+        img_frmt="png",
+        dpi: int = 400,
+        close: bool = True,
+        encoder: ImageEncoder = None,
+        settings: GlobalStyle = None,
     ):
         logger.info("Saving image {}".format(output_filename))
-        plt.savefig(output_filename, bbox_inches="tight", format=img_frmt, dpi=dpi)
-        plt.close(figure)
-        cls.close_image(figure)
+        try:
+            if encoder is None:
+                figure.savefig(
+                    output_filename, bbox_inches="tight", format=img_frmt, dpi=dpi
+                )
+            else:
+                encoder.encode(figure, output_filename, dpi, settings)
+        finally:
+            if close:
+                cls.close_image(figure)
 
     @classmethod
     def close_image(cls, figure) -> None:
+        # artists are cleared while the figure is still registered with pyplot
         figure.clf()
+        plt.close(figure)
 
     @classmethod
     def close_all(cls) -> None:
         plt.close("all")
-        plt.close(plt.gcf())
 
     @classmethod
     def get_supported_colormaps(cls) -> list[str]:
-        return ["brg", "winter", "spring", "viridis", "hsv"]
+        return ColormapRegistry.get_supported_colormaps()
 
     @classmethod
-    def colormap_dictionary_from_array(
-        cls, array: list[any], mtype: str = "brg"
-    ) -> dict[any, any]:
-        colors = [(0, 0, 0)] * len(array)
-        if mtype in cls.get_supported_colormaps():
-            if mtype == "brg":
-                colors = cm.brg(np.linspace(0, 1, len(array)))
-            elif mtype == "winter":
-                colors = cm.winter(np.linspace(0.5, 1, len(array)))
-            elif mtype == "spring":
-                colors = cm.spring(np.linspace(0, 1, len(array)))
-            elif mtype == "viridis":
-                colors = cm.viridis(np.linspace(0, 1, len(array)))
-            elif mtype == "hsv":
-                colors = cm.hsv(np.linspace(0.2, 0.8, len(array)))
-        cmap = {}
-        i = 0
-        for element in array:
-            cmap[element] = colors[i]
-            i += 1
-        return cmap
+    def colormap_from_array(cls, array: list[any], mtype: str = "brg") -> np.ndarray:
+        return ColormapRegistry.colors(mtype, len(array))
 
     @classmethod
     def set_title(cls, title: str) -> None:
@@ -80,13 +142,27 @@ class PlotterUtils:
 
 
 class Plotter:
-    def __init__(self, surface: PES, output_file: str, options: OptionsManager):
+    def __init__(
+        self,
+        surface: PES,
+        output_file: str,
+        options: OptionsManager,
+        template: FigureTemplate = None,
+        sink: ImageSink = None,
+        encoder: ImageEncoder = None,
+    ):
         self._surface = surface
         self._output_file = output_file
         self._options = options
         self._energy_range = None
         self._vertical_annotation_offset = None
         self._annotations = []
+        self._channels = None
+        self._style = None
+        self._label_mask = None
+        self._template = template
+        self._sink = sink
+        self._encoder = encoder
 
     @property
     def surface(self) -> PES:
@@ -136,51 +212,72 @@ class Plotter:
     def annotations(self, annotations: list[any]):
         self._annotations = annotations
 
-    def get_colormap(self):
-        cmap = self.options.get_global_option(Option.COLORMAP)
-        cmap = cmap.value.lower() if cmap is not None else None
-        logger.info("Plotting with colormap: {}".format(cmap))
-        return PlotterUtils.colormap_dictionary_from_array(
-            array=self.surface.reactions, mtype=cmap
-        )
+    @property
+    def channels(self) -> list[ReactionChannel]:
+        return self._channels
 
-    def get_line_color(self, rxn: Reaction, cmap: dict) -> str:
-        color = self.options.get_keyword_option(rxn.ts.name, Option.COLOR)
-        return cmap[rxn] if color is None else color.value
+    @channels.setter
+    def channels(self, channels: list[ReactionChannel]):
+        self._channels = channels
 
-    def get_line_style(self, rxn: Reaction) -> str:
-        ls = self.options.get_keyword_option(rxn.ts.name, Option.LINESTYLE)
-        return "-" if ls is None else ls.value
+    @property
+    def style(self) -> StyleTable:
+        return self._style
 
-    def get_line_width(self, rxn: Reaction) -> float:
-        lw = self.options.get_keyword_option(rxn.ts.name, Option.LINEWIDTH)
-        return 1.0 if lw is None else lw.value
+    @style.setter
+    def style(self, style: StyleTable):
+        self._style = style
 
-    def show_label(self, sp: StationaryPoint) -> bool:
-        label = self.options.get_keyword_option(sp.name, Option.LABEL)
-        label = label.value.strip().lower() if label is not None else "true"
-        return False if label == "false" else True
+    @property
+    def label_mask(self) -> np.ndarray:
+        return self._label_mask
 
-    def get_label_font(self) -> str:
-        font = self.options.get_global_option(Option.LABEL_FONT)
-        return font.value if font is not None else "DejaVu Sans"
+    @label_mask.setter
+    def label_mask(self, label_mask: np.ndarray):
+        self._label_mask = label_mask
 
-    def get_stationary_point_label(self, sp: StationaryPoint) -> str:
+    @property
+    def template(self) -> FigureTemplate:
+        return self._template
 
-        name = sp.name
+    @template.setter
+    def template(self, template: FigureTemplate):
+        self._template = template
 
-        pad_bimol = self.options.get_global_option(Option.PAD_BIMOLECULAR)
-        pad_bimol = (
-            True
-            if pad_bimol is not None and pad_bimol.value.lower() == "true"
-            else False
-        )
+    @property
+    def sink(self) -> ImageSink:
+        return self._sink
 
-        if pad_bimol and "+" in name:
-            species = name.split("+")
-            name = " ".join(species)
+    @sink.setter
+    def sink(self, sink: ImageSink):
+        self._sink = sink
 
-        return " ".join([name, "(" + str(np.round(sp.energy, 1)) + ")"])
+    @property
+    def encoder(self) -> ImageEncoder:
+        return self._encoder
+
+    @encoder.setter
+    def encoder(self, encoder: ImageEncoder):
+        self._encoder = encoder
+
+    def compile_style(self) -> StyleTable:
+        # validates every option up front, draw loops only index into the table
+        if self.style is None:
+            self.style = StyleCompiler.compile(self.surface, self.options)
+            hidden = ReactionLOD.hidden_stationary_points(self.get_channels())
+            self.label_mask = np.array(
+                [
+                    show and sp not in hidden
+                    for sp, show in zip(
+                        self.surface.get_stationary_points(), self.style.show_labels
+                    )
+                ],
+                dtype=bool,
+            )
+        return self.style
+
+    def get_label_font(self) -> FontProperties:
+        return FontRegistry.get_properties(self.compile_style().settings.label_font)
 
     def get_energy_range(self):
         if self.energy_range is None:
@@ -204,130 +301,390 @@ class Plotter:
             )
         return self.vertical_annotation_offset
 
-    def get_image_resolution(self) -> int:
-        res = self.options.get_global_option(Option.RESOLUTION)
-        if res is not None:
-            return int(res.value)
-        return 1200
+    def get_channels(self) -> list[ReactionChannel]:
+        if self.channels is None:
+            settings = self.compile_style().settings
+            if settings.lod == "none":
+                self.channels = ReactionLOD.single_channels(self.surface)
+            else:
+                self.channels = ReactionLOD.reduce(
+                    self.surface,
+                    min_channels=settings.lod_threshold,
+                    min_reactions=settings.lod_min_reactions,
+                )
+        return self.channels
+
+    def get_visible_reactions(self) -> list[Reaction]:
+        return [channel.lowest for channel in self.get_channels()]
 
     def plot_reactions(self, axis: any) -> None:
-        cmap = self.get_colormap()
-        for rxn in self.surface.reactions:
-            logger.info("Plotting reaction: {}".format(rxn.get_name()))
+        style = self.compile_style()
+        Log.log_items(
+            logger,
+            "Plotting reaction",
+            (channel.lowest.get_name() for channel in self.get_channels()),
+        )
+        for channel in self.get_channels():
+            rxn, i = channel.lowest, channel.lowest_index
             axis.plot(
                 rxn.x_coords,
                 rxn.y_coords,
-                color=self.get_line_color(rxn, cmap),
-                linestyle=self.get_line_style(rxn),
-                linewidth=self.get_line_width(rxn),
+                color=style.colors[i],
+                linestyle=style.linestyles[i],
+                linewidth=style.linewidths[i],
             )
-
-    def add_labels(self, axis: any) -> None:
-
-        show_labels = self.options.get_global_option(Option.SHOW_LABELS)
-        show_labels = (
-            True
-            if show_labels is None or show_labels.value.lower() != "false"
-            else False
+            if len(channel.hidden) > 0:
+                self.plot_hidden_channels(axis, channel)
+
+    def plot_vector_reactions(self, axis: any) -> None:
+        # must run after set_limits, curves are simplified in display coordinates
+        style = self.compile_style()
+        settings = style.settings
+        channels = self.get_channels()
+        points = [
+            axis.transData.transform(
+                np.column_stack([channel.lowest.x_coords, channel.lowest.y_coords])
+            )
+            for channel in channels
+        ]
+        # tolerances are given in points, display coordinates are in pixels
+        scale = axis.get_figure().dpi / 72.0
+        masks = PathSimplifier(
+            tolerance=settings.vector_tolerance * scale, budget=settings.vertex_budget
+        ).simplify(points)
+
+        keys = [
+            (
+                tuple(style.colors[channel.lowest_index]),
+                style.linestyles[channel.lowest_index],
+                style.linewidths[channel.lowest_index],
+            )
+            for channel in channels
+        ]
+        paths = PathSimplifier.merge(
+            keys,
+            [channel.lowest.x_coords[mask] for channel, mask in zip(channels, masks)],
+            [channel.lowest.y_coords[mask] for channel, mask in zip(channels, masks)],
+        )
+        logger.info(
+            "Writing {} reactions as {} compound paths".format(
+                len(channels), len(paths)
+            )
+        )
+        for (color, linestyle, linewidth), (x, y) in paths.items():
+            axis.plot(
+                x,
+                y,
+                color=color,
+                linestyle=linestyle,
+                linewidth=linewidth,
+                rasterized=settings.rasterize_curves,
+            )
+        for channel in channels:
+            if len(channel.hidden) > 0:
+                self.plot_hidden_channels(axis, channel)
+
+    def plot_hidden_channels(self, axis: any, channel: ReactionChannel) -> None:
+        style = self.compile_style()
+        color = style.colors[channel.lowest_index]
+        if style.settings.lod == "envelope":
+            x, lower, upper = channel.get_envelope()
+            axis.fill_between(x, lower, upper, color=color, alpha=0.2, linewidth=0)
+        ts = channel.lowest.ts
+        axis.text(
+            ts.rxn_coord,
+            ts.energy,
+            " +{}".format(len(channel.hidden)),
+            fontsize=7,
+            color=color,
+            ha="left",
+            va="bottom",
+            fontproperties=self.get_label_font(),
         )
-        if show_labels is False:
-            return None
-
-        label_loc = self.options.get_global_option(Option.LABEL_LOCATION)
 
-        if label_loc is not None and label_loc.value.lower() == "inline":
-            self.add_inline_labels(axis)
-        else:
-            self.add_offset_minima_labels(axis)
-            self.add_offset_ts_labels(axis)
+    def plot_density(self, axis: any) -> None:
+        # must run after set_limits, the image is sized to the final axes
+        style = self.compile_style()
+        indices = [channel.lowest_index for channel in self.get_channels()]
+        reactions = self.get_visible_reactions()
+        dpi = style.settings.resolution
+        figure = axis.get_figure()
+        bbox = axis.get_window_extent()
+        scale = dpi / figure.dpi
+        xlim, ylim = axis.get_xlim(), axis.get_ylim()
+
+        colors = np.array(style.colors[indices])
+        colors[:, 3] *= style.settings.density_alpha
+
+        rasterizer = DensityRasterizer(
+            width=round(bbox.width * scale),
+            height=round(bbox.height * scale),
+            xlim=xlim,
+            ylim=ylim,
+        )
+        image = rasterizer.rasterize(
+            x=np.stack([rxn.x_coords for rxn in reactions]),
+            y=np.stack([rxn.y_coords for rxn in reactions]),
+            colors=colors,
+            linewidths=style.linewidths[indices] * dpi / 72.0,
+        )
+        axis.imshow(
+            image,
+            extent=(xlim[0], xlim[1], ylim[0], ylim[1]),
+            origin="upper",
+            aspect="auto",
+            interpolation="nearest",
+            zorder=0,
+        )
+        axis.set_xlim(xlim)
+        axis.set_ylim(ylim)
+
+    def get_labels(self) -> list[Label]:
+        settings = self.compile_style().settings
+        if settings.show_labels is False:
+            return []
+
+        if settings.label_location == "inline":
+            return self.get_inline_labels()
+        return self.get_offset_minima_labels() + self.get_offset_ts_labels()
+
+    def get_offset_minima_labels(self) -> list[Label]:
+        style = self.compile_style()
+        return [
+            Label(
+                text=style.labels[i],
+                xy=(sp.rxn_coord, sp.energy),
+                xytext=(
+                    sp.rxn_coord,
+                    sp.energy - self.get_vertical_annotation_offset(),
+                ),
+                va="bottom",
+                arrow=True,
+            )
+            for i, sp in enumerate(self.surface.minima)
+            if self.label_mask[i]
+        ]
+
+    def get_offset_ts_labels(self) -> list[Label]:
+        style = self.compile_style()
+        offset = len(self.surface.minima)
+        return [
+            Label(
+                text=style.labels[i],
+                xy=(sp.rxn_coord, sp.energy),
+                xytext=(
+                    sp.rxn_coord,
+                    sp.energy + self.get_vertical_annotation_offset(),
+                ),
+                va="top",
+                arrow=True,
+            )
+            for i, sp in enumerate(self.surface.ts, start=offset)
+            if self.label_mask[i]
+        ]
+
+    def get_inline_labels(self) -> list[Label]:
+        style = self.compile_style()
+        hidden = ReactionLOD.hidden_stationary_points(self.get_channels())
+        return [
+            Label(
+                text=species.name,
+                xy=(species.rxn_coord, species.energy),
+                xytext=(species.rxn_coord, species.energy),
+                va="center",
+                color=tuple(style.label_colors[i]),
+                fontsize=8,
+                box=True,
+            )
+            for i, species in enumerate(self.surface.get_stationary_points())
+            if species not in hidden
+        ]
 
-    def add_offset_minima_labels(self, axis: any) -> None:
-        for sp in self.surface.minima:
-            sp: StationaryPoint
-            if self.show_label(sp):
+    def add_labels(self, axis: any) -> None:
+        for label in self.get_labels():
+            if label.box:
                 axis.annotate(
-                    self.get_stationary_point_label(sp),
-                    (sp.rxn_coord, sp.energy),
-                    xytext=(
-                        sp.rxn_coord,
-                        sp.energy - self.get_vertical_annotation_offset(),
-                    ),
-                    textcoords="data",
+                    label.text,
+                    label.xy,
+                    fontsize=label.fontsize,
+                    color=label.color,
                     ha="center",
-                    va="bottom",
-                    arrowprops=dict(arrowstyle="->", color="k"),
-                    fontfamily=self.get_label_font(),
+                    va=label.va,
+                    bbox=dict(
+                        facecolor="white",
+                        edgecolor=label.color,
+                        boxstyle="round,pad=0.1",
+                    ),
                 )
-
-    def add_offset_ts_labels(self, axis: any) -> None:
-        for sp in self.surface.ts:
-            sp: StationaryPoint
-            if self.show_label(sp):
+            else:
                 axis.annotate(
-                    self.get_stationary_point_label(sp),
-                    (sp.rxn_coord, sp.energy),
-                    xytext=(
-                        sp.rxn_coord,
-                        sp.energy + self.get_vertical_annotation_offset(),
-                    ),
+                    label.text,
+                    label.xy,
+                    xytext=label.xytext,
                     textcoords="data",
                     ha="center",
-                    va="top",
-                    arrowprops=dict(arrowstyle="->", color="k"),  # Arrow properties
-                    fontfamily=self.get_label_font(),
+                    va=label.va,
+                    arrowprops=dict(arrowstyle="->", color="k"),
+                    fontproperties=self.get_label_font(),
                 )
 
-    def add_inline_labels(self, axis: any):
-        name_pos_map = {}
-        cmap = self.get_colormap()
-        ts_cmap = {}
-        for species in self.surface.minima + self.surface.ts:
-            name_pos_map[species.name] = (species.rxn_coord, species.energy)
-        for rxn in self.surface.reactions:
-            ts_cmap[rxn.ts.name] = cmap[rxn]
-
-        for species in name_pos_map:
-
-            color = ts_cmap[species] if species in ts_cmap else "k"
-
-            axis.annotate(
-                species,
-                name_pos_map[species],
-                fontsize=8,
-                color=color,
-                ha="center",
-                va="center",
-                bbox=dict(facecolor="white", edgecolor=color, boxstyle="round,pad=0.1"),
-            )
-
-    def set_limits(self, axis: any) -> None:
+    def get_limits(
+        self, positions: list[tuple[float, float]]
+    ) -> tuple[list[float], list[float]]:
+        # stationary points, in every energy method, and any text positions must
+        # fit inside the axes
         xcoords = [s.rxn_coord for s in self.surface.get_stationary_points()]
-        ycoords = [s.energy for s in self.surface.get_stationary_points()]
-        labels = [text.get_position() for text in axis.texts]
-        if labels is not None:
-            xcoords += [i[0] for i in labels]
-            ycoords += [i[1] for i in labels]
+        ycoords = [
+            e
+            for s in self.surface.get_stationary_points()
+            for e in (list(s.energies.values()) or [s.energy])
+        ]
+        xcoords += [i[0] for i in positions]
+        ycoords += [i[1] for i in positions]
         ymin = np.min(ycoords) - 0.1 * self.get_energy_range()
         ymax = np.max(ycoords) + 0.1 * self.get_energy_range()
-        axis.set_xlim([np.min(xcoords) - 0.5, np.max(xcoords) + 0.5])
-        axis.set_ylim([ymin, ymax])
+        return [np.min(xcoords) - 0.5, np.max(xcoords) + 0.5], [ymin, ymax]
+
+    def set_limits(self, axis: any) -> None:
+        xlim, ylim = self.get_limits([text.get_position() for text in axis.texts])
+        axis.set_xlim(xlim)
+        axis.set_ylim(ylim)
 
     def save_image(self, fig: any) -> None:
+        # the figure is closed or released by whoever created it
+        if self.sink is not None:
+            name = os.path.splitext(os.path.basename(self.output_file))[0]
+            self.sink.write(fig, name, dpi=self.compile_style().settings.resolution)
+            return None
+        settings = self.compile_style().settings
         PlotterUtils.save_image(
             output_filename=self.output_file,
             figure=fig,
-            dpi=self.get_image_resolution(),
+            dpi=settings.resolution,
+            close=False,
+            encoder=self.encoder if self.encoder is not None else ImageEncoder(),
+            settings=settings,
         )
 
-    def plot(self) -> None:
-        logger.info("Plotting surface")
-        fig, axis = PlotterUtils.create_figure(
+    @classmethod
+    def create_template(cls) -> FigureTemplate:
+        return FigureTemplate(
             xlabel="Reaction Coordinate / arb. units",
             ylabel="Energy / kJ mol$^{-1}$",
             title="",
         )
 
-        self.plot_reactions(axis)
-        self.add_labels(axis)
-        self.set_limits(axis)
-        self.save_image(fig)
+    def create_figure(self) -> tuple[any, any]:
+        if self.template is not None:
+            return self.template.acquire()
+        return PlotterUtils.create_figure(
+            xlabel="Reaction Coordinate / arb. units",
+            ylabel="Energy / kJ mol$^{-1}$",
+            title="",
+        )
+
+    def plot_overlay(self, axis: any) -> None:
+        # every method in its own color, reactions keep their linestyle and width
+        style = self.compile_style()
+        methods = self.surface.methods
+        colors = ColormapRegistry.get_colormap("tab10")(np.arange(len(methods)) % 10)
+        for k, method in enumerate(methods):
+            for j, channel in enumerate(self.get_channels()):
+                rxn, i = channel.lowest, channel.lowest_index
+                axis.plot(
+                    rxn.x_coords,
+                    rxn.series[method],
+                    color=colors[k],
+                    linestyle=style.linestyles[i],
+                    linewidth=style.linewidths[i],
+                    label=method if j == 0 else None,
+                )
+        for channel in self.get_channels():
+            if len(channel.hidden) > 0:
+                self.plot_hidden_channels(axis, channel)
+        axis.legend(fontsize=8, frameon=False)
+
+    def draw(self, axis: any) -> None:
+        style = self.compile_style()
+        if len(self.surface.methods) > 0:
+            self.plot_overlay(axis)
+            self.add_labels(axis)
+            self.set_limits(axis)
+        elif style.settings.render_mode == "density":
+            self.add_labels(axis)
+            self.set_limits(axis)
+            self.plot_density(axis)
+        elif ImageEncoder.is_vector_output(self.output_file):
+            self.add_labels(axis)
+            self.set_limits(axis)
+            self.plot_vector_reactions(axis)
+        else:
+            self.plot_reactions(axis)
+            self.add_labels(axis)
+            self.set_limits(axis)
+
+    def plot_panels(self) -> None:
+        # panels are drawn from method views, so layout and curves are not recomputed
+        methods = self.surface.methods
+        columns = min(len(methods), 3)
+        rows = int(np.ceil(len(methods) / columns))
+        fig, axes = plt.subplots(
+            rows,
+            columns,
+            sharex=True,
+            sharey=True,
+            squeeze=False,
+            figsize=(4.8 * columns, 3.6 * rows),
+        )
+        try:
+            xlims, ylims = [], []
+            for method, axis in zip(methods, axes.flat):
+                view = Plotter(
+                    self.surface.get_method_view(method),
+                    self.output_file,
+                    self.options,
+                )
+                view.draw(axis)
+                axis.set_title(method)
+                xlims += axis.get_xlim()
+                ylims += axis.get_ylim()
+            # the axes are shared, so the limits must cover every panel
+            axes[0, 0].set_xlim(min(xlims), max(xlims))
+            axes[0, 0].set_ylim(min(ylims), max(ylims))
+            for axis in axes.flat[len(methods) :]:
+                axis.set_visible(False)
+            for axis in axes[-1, :]:
+                axis.set_xlabel("Reaction Coordinate / arb. units")
+            for axis in axes[:, 0]:
+                axis.set_ylabel("Energy / kJ mol$^{-1}$")
+            fig.tight_layout()
+            self.save_image(fig)
+        finally:
+            PlotterUtils.close_image(fig)
+
+    def plot(self) -> None:
+        style = self.compile_style()
+        if WebDocumentWriter.is_web_output(self.output_file):
+            # the browser draws the document, no figure is created or rasterized
+            WebDocumentWriter.write(self, self.output_file)
+            return None
+
+        if len(self.surface.methods) > 0 and style.settings.energy_layout == "panels":
+            logger.info(
+                "Plotting {} energy methods as panels".format(len(self.surface.methods))
+            )
+            self.plot_panels()
+            return None
+
+        logger.info("Plotting surface")
+        fig, axis = self.create_figure()
+
+        try:
+            self.draw(axis)
+            self.save_image(fig)
+        finally:
+            # runs when drawing fails too, so no figure outlives its surface
+            if self.template is not None:
+                self.template.release()
+            else:
+                PlotterUtils.close_image(fig)
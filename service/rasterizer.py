@@ -0,0 +1,209 @@
+import os
+from typing import Tuple
+
+import numpy as np
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class DensityRasterizer:
+    # splats curves into one RGBA image, each pixel taking the coverage-weighted color
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        xlim: Tuple[float, float],
+        ylim: Tuple[float, float],
+        step: float = 1.0,
+        budget: int = 2_000_000,
+    ):
+        self._width = max(int(width), 1)
+        self._height = max(int(height), 1)
+        self._xlim = xlim
+        self._ylim = ylim
+        self._step = step
+        self._budget = budget
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def xlim(self) -> Tuple[float, float]:
+        return self._xlim
+
+    @property
+    def ylim(self) -> Tuple[float, float]:
+        return self._ylim
+
+    def to_pixels(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # row 0 is the top of the image, matching imshow(origin="upper")
+        px = (x - self.xlim[0]) / (self.xlim[1] - self.xlim[0]) * self.width
+        py = (self.ylim[1] - y) / (self.ylim[1] - self.ylim[0]) * self.height
+        return px, py
+
+    def sample_segments(
+        self, px: np.ndarray, py: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # flatten all segments of all curves, then emit samples every `step` px
+        n_points = px.shape[1]
+        x0, x1 = px[:, :-1].ravel(), px[:, 1:].ravel()
+        y0, y1 = py[:, :-1].ravel(), py[:, 1:].ravel()
+        dx, dy = x1 - x0, y1 - y0
+        length = np.hypot(dx, dy)
+        counts = np.maximum(np.ceil(length / self._step), 1).astype(np.int64)
+
+        segment = np.repeat(np.arange(length.size), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        t = (np.arange(segment.size) - offsets + 0.5) / counts[segment]
+
+        sx = x0[segment] + t * dx[segment]
+        sy = y0[segment] + t * dy[segment]
+        weight = (length / counts)[segment]
+
+        curve = segment // (n_points - 1)
+        return sx, sy, weight, curve
+
+    def splat(
+        self, sx: np.ndarray, sy: np.ndarray, weight: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # bilinear splat onto pixel centres at (i + 0.5, j + 0.5)
+        fx, fy = sx - 0.5, sy - 0.5
+        ix, iy = np.floor(fx).astype(np.int64), np.floor(fy).astype(np.int64)
+        ax, ay = fx - ix, fy - iy
+        indices, inks, samples = [], [], []
+        for ox, oy, w in (
+            (0, 0, (1 - ax) * (1 - ay)),
+            (1, 0, ax * (1 - ay)),
+            (0, 1, (1 - ax) * ay),
+            (1, 1, ax * ay),
+        ):
+            cx, cy = ix + ox, iy + oy
+            inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+            indices.append(cy[inside] * self.width + cx[inside])
+            inks.append((w * weight)[inside])
+            samples.append(np.flatnonzero(inside))
+        return np.concatenate(indices), np.concatenate(inks), np.concatenate(samples)
+
+    def accumulate(
+        self,
+        px: np.ndarray,
+        py: np.ndarray,
+        rgba: np.ndarray,
+        ink: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # touched pixels and their (4, n) premultiplied color and coverage sums
+        sx, sy, weight, curve = self.sample_segments(px, py)
+        index, weight, sample = self.splat(sx, sy, weight * ink[curve])
+        curve = curve[sample]
+
+        # histograms over the touched pixels only, so no temporary array is the
+        # size of the whole frame
+        weight = weight * rgba[curve, 3]
+        pixels, index = np.unique(index, return_inverse=True)
+        sums = np.empty((4, pixels.size), dtype=np.float32)
+        for channel in range(3):
+            sums[channel] = np.bincount(
+                index, weights=weight * rgba[curve, channel], minlength=pixels.size
+            )
+        sums[3] = np.bincount(index, weights=weight, minlength=pixels.size)
+        return pixels, sums
+
+    @classmethod
+    def box_blur(
+        cls, image: np.ndarray, size: int, axis: int, block: int = 1 << 20
+    ) -> None:
+        # in place moving-window mean along axis, from cumulative sums
+        if size <= 1:
+            return None
+        before = size // 2
+        after = size - before - 1
+        lines = np.moveaxis(image, axis, -1)
+        n = lines.shape[-1]
+        upper = np.minimum(np.arange(n) + after + 1, n)
+        lower = np.maximum(np.arange(n) - before, 0)
+        step = max(1, block // n)
+        for start in range(0, lines.shape[0], step):
+            part = lines[start : start + step]
+            total = np.zeros((part.shape[0], n + 1))
+            np.cumsum(part, axis=1, out=total[:, 1:])
+            part[...] = (total[:, upper] - total[:, lower]) / size
+
+    def chunks(self, px: np.ndarray, py: np.ndarray) -> list[np.ndarray]:
+        # bound peak memory by splitting curves into chunks of ~budget samples
+        length = np.hypot(np.diff(px, axis=1), np.diff(py, axis=1))
+        samples = np.cumsum(np.maximum(np.ceil(length / self._step), 1).sum(axis=1))
+        bounds = np.searchsorted(
+            samples, np.arange(self._budget, samples[-1], self._budget)
+        )
+        chunks = np.split(np.arange(px.shape[0]), np.unique(bounds + 1))
+        return [chunk for chunk in chunks if chunk.size > 0]
+
+    def rasterize(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        colors: np.ndarray,
+        linewidths: np.ndarray,
+    ) -> np.ndarray:
+        # (n_curves, n_points) data coordinates to a (height, width, 4) image
+        logger.info(
+            "Rasterizing {} curves into a {}x{} image".format(
+                x.shape[0], self.width, self.height
+            )
+        )
+        # premultiplied red, green, blue and coverage, accumulated in one buffer
+        image = np.zeros((4, self.height, self.width), dtype=np.float32)
+
+        px, py = self.to_pixels(np.asarray(x, float), np.asarray(y, float))
+        widths = np.maximum(np.asarray(linewidths, float), 1.0)
+        brushes = np.round(widths).astype(int)
+        rgba = np.asarray(colors, float)
+
+        # curves are splatted one pixel wide and then widened with a square
+        # box brush, one pass per distinct brush size and channel
+        sizes = np.unique(brushes)
+        layer = None if len(sizes) == 1 else np.empty_like(image[0])
+        for brush in sizes:
+            group = np.flatnonzero(brushes == brush)
+            splats = [
+                self.accumulate(
+                    px[group[chunk]],
+                    py[group[chunk]],
+                    rgba[group[chunk]],
+                    widths[group[chunk]] / brush,
+                )
+                for chunk in self.chunks(px[group], py[group])
+            ]
+            for channel in range(4):
+                target = image[channel] if layer is None else layer
+                target.fill(0.0)
+                for pixels, sums in splats:
+                    target.reshape(-1)[pixels] += sums[channel]
+                self.box_blur(target, brush, 0)
+                self.box_blur(target, brush, 1)
+                target *= brush
+                if layer is not None:
+                    image[channel] += layer
+        del layer
+
+        coverage = image[3]
+        covered = coverage > 0
+        for channel in image[:3]:
+            np.divide(channel, coverage, out=channel, where=covered)
+        np.clip(image, 0.0, 1.0, out=image)
+
+        # the figure holds the image until it is saved, 8-bit pixels take a quarter
+        # of the memory
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        for i, channel in enumerate(image):
+            channel *= 255.0
+            channel += 0.5
+            pixels[..., i] = channel
+        return pixels
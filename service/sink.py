@@ -0,0 +1,137 @@
+import io
+import os
+from abc import ABC, abstractmethod
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class ImageSink(ABC):
+    # collects the figures of many surfaces into one output
+    def __init__(self, filename: str):
+        self._filename = filename
+        self._count = 0
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @abstractmethod
+    def write(self, figure: any, name: str, dpi: int) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class PdfSink(ImageSink):
+    # one page per surface, written as it arrives
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        logger.info("Writing pages to {}".format(filename))
+        self._pdf = PdfPages(filename)
+
+    def write(self, figure: any, name: str, dpi: int) -> None:
+        logger.info("Adding page {} for {}".format(self.count + 1, name))
+        self._pdf.savefig(figure, bbox_inches="tight", dpi=dpi)
+        self._count += 1
+
+    def close(self) -> None:
+        logger.info("Closing {} with {} pages".format(self.filename, self.count))
+        self._pdf.close()
+
+
+class ContactSheetSink(ImageSink):
+    # only the sheet being filled is kept in memory
+    def __init__(self, filename: str, columns: int = 4, rows: int = 4, dpi: int = 100):
+        super().__init__(filename)
+        self._columns = columns
+        self._rows = rows
+        self._dpi = dpi
+        self._sheet = None
+        self._tile_shape = None
+        self._sheets = 0
+
+    @property
+    def tiles_per_sheet(self) -> int:
+        return self._columns * self._rows
+
+    def get_sheet_filename(self, index: int) -> str:
+        root, ext = os.path.splitext(self.filename)
+        return "{}-{:03d}{}".format(root, index, ext if ext else ".png")
+
+    def render_tile(self, figure: any, name: str) -> np.ndarray:
+        # the surface name is shown as the axes title on its tile only, and the
+        # layout is fitted to this tile's labels so none is clipped
+        axis = figure.axes[0]
+        previous = axis.get_title()
+        params = figure.subplotpars
+        layout = {
+            key: getattr(params, key)
+            for key in ["left", "right", "bottom", "top", "wspace", "hspace"]
+        }
+        axis.set_title(name, fontsize=9)
+        try:
+            figure.tight_layout()
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format="rgba", dpi=self._dpi)
+        finally:
+            axis.set_title(previous)
+            figure.subplots_adjust(**layout)
+        width = int(figure.get_figwidth() * self._dpi)
+        height = int(figure.get_figheight() * self._dpi)
+        return np.frombuffer(buffer.getvalue(), dtype=np.uint8).reshape(
+            height, width, 4
+        )
+
+    def write(self, figure: any, name: str, dpi: int) -> None:
+        tile = self.render_tile(figure, name)
+        if self._tile_shape is None:
+            self._tile_shape = tile.shape
+        height, width = self._tile_shape[:2]
+        tile = tile[:height, :width]
+
+        slot = self.count % self.tiles_per_sheet
+        if slot == 0:
+            self._sheet = np.full(
+                (height * self._rows, width * self._columns, 4), 255, dtype=np.uint8
+            )
+        row, column = divmod(slot, self._columns)
+        self._sheet[
+            row * height : row * height + tile.shape[0],
+            column * width : column * width + tile.shape[1],
+        ] = tile
+        self._count += 1
+        if self.count % self.tiles_per_sheet == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._sheet is None:
+            return None
+        self._sheets += 1
+        filename = self.get_sheet_filename(self._sheets)
+        logger.info("Writing contact sheet {}".format(filename))
+        plt.imsave(filename, self._sheet)
+        self._sheet = None
+
+    def close(self) -> None:
+        self.flush()
+        logger.info(
+            "Wrote {} surfaces to {} contact sheets".format(self.count, self._sheets)
+        )
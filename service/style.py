@@ -0,0 +1,421 @@
+import os
+from typing import Optional
+
+import numpy as np
+from matplotlib.cbook import ls_mapper_r
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+
+from domain.options import Option, OptionsManager
+from domain.pes import PES, Reaction, StationaryPoint
+from service.colormap import ColormapRegistry
+from service.fonts import FontRegistry
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class GlobalStyle:
+    # validated, typed values of the global section
+    def __init__(
+        self,
+        pad_bimolecular: bool,
+        show_labels: bool,
+        label_location: str,
+        label_font: str,
+        resolution: int,
+        colormap: Optional[str],
+        colormap_range: Optional[tuple[float, float]],
+        render_mode: str,
+        density_alpha: float,
+        lod: str,
+        lod_threshold: int,
+        lod_min_reactions: int,
+        energy_layout: str,
+        compression: int,
+        palette: int,
+        quality: int,
+        vector_tolerance: float,
+        vertex_budget: int,
+        rasterize_curves: bool,
+    ):
+        self._pad_bimolecular = pad_bimolecular
+        self._show_labels = show_labels
+        self._label_location = label_location
+        self._label_font = label_font
+        self._resolution = resolution
+        self._colormap = colormap
+        self._colormap_range = colormap_range
+        self._render_mode = render_mode
+        self._density_alpha = density_alpha
+        self._lod = lod
+        self._lod_threshold = lod_threshold
+        self._lod_min_reactions = lod_min_reactions
+        self._energy_layout = energy_layout
+        self._compression = compression
+        self._palette = palette
+        self._quality = quality
+        self._vector_tolerance = vector_tolerance
+        self._vertex_budget = vertex_budget
+        self._rasterize_curves = rasterize_curves
+
+    @property
+    def pad_bimolecular(self) -> bool:
+        return self._pad_bimolecular
+
+    @property
+    def show_labels(self) -> bool:
+        return self._show_labels
+
+    @property
+    def label_location(self) -> str:
+        return self._label_location
+
+    @property
+    def label_font(self) -> str:
+        return self._label_font
+
+    @property
+    def resolution(self) -> int:
+        return self._resolution
+
+    @property
+    def colormap(self) -> Optional[str]:
+        return self._colormap
+
+    @property
+    def colormap_range(self) -> Optional[tuple[float, float]]:
+        return self._colormap_range
+
+    @property
+    def render_mode(self) -> str:
+        return self._render_mode
+
+    @property
+    def density_alpha(self) -> float:
+        return self._density_alpha
+
+    @property
+    def lod(self) -> str:
+        return self._lod
+
+    @property
+    def lod_threshold(self) -> int:
+        return self._lod_threshold
+
+    @property
+    def lod_min_reactions(self) -> int:
+        return self._lod_min_reactions
+
+    @property
+    def energy_layout(self) -> str:
+        return self._energy_layout
+
+    @property
+    def compression(self) -> int:
+        return self._compression
+
+    @property
+    def palette(self) -> int:
+        return self._palette
+
+    @property
+    def quality(self) -> int:
+        return self._quality
+
+    @property
+    def vector_tolerance(self) -> float:
+        return self._vector_tolerance
+
+    @property
+    def vertex_budget(self) -> int:
+        return self._vertex_budget
+
+    @property
+    def rasterize_curves(self) -> bool:
+        return self._rasterize_curves
+
+
+class StyleTable:
+    # read-only style arrays, indexed like PES.reactions and get_stationary_points
+    def __init__(
+        self,
+        settings: GlobalStyle,
+        colors: np.ndarray,
+        linestyles: tuple[str, ...],
+        linewidths: np.ndarray,
+        labels: tuple[str, ...],
+        show_labels: np.ndarray,
+        label_colors: np.ndarray,
+    ):
+        self._settings = settings
+        self._colors = self.freeze(colors)
+        self._linestyles = linestyles
+        self._linewidths = self.freeze(linewidths)
+        self._labels = labels
+        self._show_labels = self.freeze(show_labels)
+        self._label_colors = self.freeze(label_colors)
+
+    @classmethod
+    def freeze(cls, array: np.ndarray) -> np.ndarray:
+        array = np.array(array)
+        array.setflags(write=False)
+        return array
+
+    @property
+    def settings(self) -> GlobalStyle:
+        return self._settings
+
+    @property
+    def colors(self) -> np.ndarray:
+        return self._colors
+
+    @property
+    def linestyles(self) -> tuple[str, ...]:
+        return self._linestyles
+
+    @property
+    def linewidths(self) -> np.ndarray:
+        return self._linewidths
+
+    @property
+    def labels(self) -> tuple[str, ...]:
+        return self._labels
+
+    @property
+    def show_labels(self) -> np.ndarray:
+        return self._show_labels
+
+    @property
+    def label_colors(self) -> np.ndarray:
+        return self._label_colors
+
+
+class StyleCompiler:
+    # rejects bad option values before any rendering work starts
+
+    # every string linestyle matplotlib lines accept, including the undrawn
+    # "None", " " and ""
+    LINESTYLES = [*Line2D.lineStyles, *ls_mapper_r, "none"]
+    LABEL_LOCATIONS = ["offset", "inline"]
+    RENDER_MODES = ["lines", "density"]
+    LOD_MODES = ["none", "lowest", "envelope"]
+    ENERGY_LAYOUTS = ["overlay", "panels"]
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def invalid(
+        cls, option: Option, value: str, key: Optional[str] = None
+    ) -> ValueError:
+        target = "" if key is None else " for {}".format(key)
+        message = "Invalid value {} for option {}{}".format(value, option.value, target)
+        logger.error(message)
+        return ValueError(message)
+
+    @classmethod
+    def to_bool(cls, option: Option, value: str, key: Optional[str] = None) -> bool:
+        value = value.strip().lower()
+        if value not in ["true", "false"]:
+            raise cls.invalid(option, value, key)
+        return value == "true"
+
+    @classmethod
+    def to_number(
+        cls,
+        option: Option,
+        value: str,
+        kind: type,
+        minimum: float,
+        maximum: float = np.inf,
+        key: Optional[str] = None,
+    ) -> float | int:
+        try:
+            number = kind(value)
+        except ValueError:
+            raise cls.invalid(option, value, key)
+        if not minimum <= number <= maximum:
+            raise cls.invalid(option, value, key)
+        return number
+
+    @classmethod
+    def to_choice(cls, option: Option, value: str, choices: list[str]) -> str:
+        value = value.strip().lower()
+        if value not in choices:
+            raise cls.invalid(option, value)
+        return value
+
+    @classmethod
+    def to_rgba(cls, option: Option, value: str, key: str) -> tuple:
+        try:
+            return to_rgba(value)
+        except ValueError:
+            raise cls.invalid(option, value, key)
+
+    @classmethod
+    def to_colormap(cls, option: Option, value: str) -> str:
+        name = ColormapRegistry.resolve_name(value)
+        if name is None:
+            raise cls.invalid(option, value)
+        return name
+
+    @classmethod
+    def to_range(cls, option: Option, value: str) -> tuple[float, float]:
+        bounds = value.split(",")
+        if len(bounds) != 2:
+            raise cls.invalid(option, value)
+        lower, upper = [cls.to_number(option, x, float, 0, 1) for x in bounds]
+        return lower, upper
+
+    @classmethod
+    def compile_globals(cls, options: OptionsManager) -> GlobalStyle:
+        def value(option: Option, default: Optional[str]) -> Optional[str]:
+            definition = options.get_global_option(option)
+            return default if definition is None else definition.value
+
+        colormap = value(Option.COLORMAP, None)
+        if colormap is not None:
+            colormap = cls.to_colormap(Option.COLORMAP, colormap)
+
+        colormap_range = value(Option.COLORMAP_RANGE, None)
+        if colormap_range is not None:
+            colormap_range = cls.to_range(Option.COLORMAP_RANGE, colormap_range)
+
+        return GlobalStyle(
+            pad_bimolecular=cls.to_bool(
+                Option.PAD_BIMOLECULAR, value(Option.PAD_BIMOLECULAR, "false")
+            ),
+            show_labels=cls.to_bool(
+                Option.SHOW_LABELS, value(Option.SHOW_LABELS, "true")
+            ),
+            label_location=cls.to_choice(
+                Option.LABEL_LOCATION,
+                value(Option.LABEL_LOCATION, "offset"),
+                cls.LABEL_LOCATIONS,
+            ),
+            label_font=FontRegistry.resolve(value(Option.LABEL_FONT, "DejaVu Sans")),
+            resolution=cls.to_number(
+                Option.RESOLUTION, value(Option.RESOLUTION, "1200"), int, 1
+            ),
+            colormap=colormap,
+            colormap_range=colormap_range,
+            render_mode=cls.to_choice(
+                Option.RENDER_MODE, value(Option.RENDER_MODE, "lines"), cls.RENDER_MODES
+            ),
+            density_alpha=cls.to_number(
+                Option.DENSITY_ALPHA, value(Option.DENSITY_ALPHA, "1.0"), float, 0, 1
+            ),
+            lod=cls.to_choice(Option.LOD, value(Option.LOD, "none"), cls.LOD_MODES),
+            lod_threshold=cls.to_number(
+                Option.LOD_THRESHOLD, value(Option.LOD_THRESHOLD, "2"), int, 2
+            ),
+            lod_min_reactions=cls.to_number(
+                Option.LOD_MIN_REACTIONS, value(Option.LOD_MIN_REACTIONS, "0"), int, 0
+            ),
+            energy_layout=cls.to_choice(
+                Option.ENERGY_LAYOUT,
+                value(Option.ENERGY_LAYOUT, "overlay"),
+                cls.ENERGY_LAYOUTS,
+            ),
+            compression=cls.to_number(
+                Option.COMPRESSION, value(Option.COMPRESSION, "6"), int, 0, 9
+            ),
+            palette=cls.to_number(
+                Option.PALETTE, value(Option.PALETTE, "0"), int, 0, 256
+            ),
+            quality=cls.to_number(
+                Option.QUALITY, value(Option.QUALITY, "90"), int, 1, 100
+            ),
+            vector_tolerance=cls.to_number(
+                Option.VECTOR_TOLERANCE, value(Option.VECTOR_TOLERANCE, "0"), float, 0
+            ),
+            vertex_budget=cls.to_number(
+                Option.VERTEX_BUDGET, value(Option.VERTEX_BUDGET, "0"), int, 0
+            ),
+            rasterize_curves=cls.to_bool(
+                Option.RASTERIZE_CURVES, value(Option.RASTERIZE_CURVES, "false")
+            ),
+        )
+
+    @classmethod
+    def compile_reaction(
+        cls, options: OptionsManager, rxn: Reaction, default_color: np.ndarray
+    ) -> tuple[tuple, str, float]:
+        key = rxn.ts.name
+        color = options.get_keyword_option(key, Option.COLOR)
+        linestyle = options.get_keyword_option(key, Option.LINESTYLE)
+        linewidth = options.get_keyword_option(key, Option.LINEWIDTH)
+
+        color = (
+            tuple(default_color)
+            if color is None
+            else cls.to_rgba(Option.COLOR, color.value, key)
+        )
+        if linestyle is None:
+            linestyle = "-"
+        elif linestyle.value in cls.LINESTYLES:
+            linestyle = linestyle.value
+        else:
+            raise cls.invalid(Option.LINESTYLE, linestyle.value, key)
+        linewidth = (
+            1.0
+            if linewidth is None
+            else cls.to_number(Option.LINEWIDTH, linewidth.value, float, 0, key=key)
+        )
+        return color, linestyle, linewidth
+
+    @classmethod
+    def compile_label(
+        cls, options: OptionsManager, sp: StationaryPoint, settings: GlobalStyle
+    ) -> tuple[str, bool]:
+        name = sp.name
+        if settings.pad_bimolecular and "+" in name:
+            name = " ".join(name.split("+"))
+        label = " ".join([name, "(" + str(np.round(sp.energy, 1)) + ")"])
+
+        show = options.get_keyword_option(sp.name, Option.LABEL)
+        show = True if show is None else cls.to_bool(Option.LABEL, show.value, sp.name)
+        return label, show
+
+    @classmethod
+    def compile(cls, surface: PES, options: OptionsManager) -> StyleTable:
+        settings = cls.compile_globals(options)
+        logger.info("Plotting with colormap: {}".format(settings.colormap))
+
+        cmap = ColormapRegistry.colors(
+            settings.colormap, len(surface.reactions), settings.colormap_range
+        )
+        reactions = [
+            cls.compile_reaction(options, rxn, cmap[i])
+            for i, rxn in enumerate(surface.reactions)
+        ]
+
+        species = surface.get_stationary_points()
+        labels = [cls.compile_label(options, sp, settings) for sp in species]
+
+        # inline labels take the colormap color of their reaction, minima are black
+        ts_colors = {rxn.ts.name: cmap[i] for i, rxn in enumerate(surface.reactions)}
+        label_colors = [
+            ts_colors[sp.name] if sp.name in ts_colors else to_rgba("k")
+            for sp in species
+        ]
+
+        known = {sp.name for sp in species}
+        for option in options.options:
+            if option.key is not None and option.key not in known:
+                logger.warning(
+                    "Ignoring {} option for unknown species {}".format(
+                        option.option.value, option.key
+                    )
+                )
+
+        return StyleTable(
+            settings=settings,
+            colors=np.array([rxn[0] for rxn in reactions]).reshape(-1, 4),
+            linestyles=tuple(rxn[1] for rxn in reactions),
+            linewidths=np.array([rxn[2] for rxn in reactions], dtype=float),
+            labels=tuple(label[0] for label in labels),
+            show_labels=np.array([label[1] for label in labels], dtype=bool),
+            label_colors=np.array(label_colors).reshape(-1, 4),
+        )
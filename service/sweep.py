@@ -0,0 +1,215 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+from domain.options import Option, OptionDefinition, OptionsManager, OptionType
+from domain.pes import PES
+from service.colormap import ColormapRegistry
+from service.figure import FigureTemplate
+from service.fonts import FontRegistry
+from service.logging import Log
+from service.plotter import Plotter
+from service.sink import ImageSink
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+# per worker process state, set once by the pool initializer
+_surface: Optional[PES] = None
+_template: Optional[FigureTemplate] = None
+
+
+def _init_worker(surface: PES) -> None:
+    global _surface, _template
+    _surface = surface
+    _template = Plotter.create_template()
+
+
+def _render_worker(output_file: str, options: OptionsManager) -> str:
+    Plotter(_surface, output_file, options, template=_template).plot()
+    return output_file
+
+
+class SweepVariant:
+    # one combination of global option overrides and its output file
+    def __init__(self, overrides: dict[Option, str], output_file: str):
+        self._overrides = overrides
+        self._output_file = output_file
+
+    @property
+    def overrides(self) -> dict[Option, str]:
+        return self._overrides
+
+    @property
+    def output_file(self) -> str:
+        return self._output_file
+
+    def get_name(self) -> str:
+        return ", ".join(
+            "{}={}".format(option.value, value)
+            for option, value in self.overrides.items()
+        )
+
+    def apply(self, options: OptionsManager) -> OptionsManager:
+        # overridden global options replace the ones from the input file
+        kept = [
+            x
+            for x in options.options
+            if not (x.type == OptionType.GLOBAL and x.option in self.overrides)
+        ]
+        overrides = [
+            OptionDefinition(
+                type=OptionType.GLOBAL, option=option, key=None, value=value
+            )
+            for option, value in self.overrides.items()
+        ]
+        return OptionsManager(options=kept + overrides)
+
+
+class OptionSweep:
+    # renders one computed surface per combination of global option values
+
+    # values which expand to everything available on this system
+    EXPANSIONS = {
+        Option.COLORMAP: ColormapRegistry.get_supported_colormaps,
+        Option.LABEL_FONT: lambda: list(FontRegistry.get_font_names()),
+    }
+    WILDCARD = "all"
+
+    def __init__(self, surface: PES, options: OptionsManager, workers: int = 1):
+        self._surface = surface
+        self._options = options
+        self._workers = max(1, workers)
+
+    @property
+    def surface(self) -> PES:
+        return self._surface
+
+    @property
+    def options(self) -> OptionsManager:
+        return self._options
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @classmethod
+    def parse_grid(cls, specs: list[str]) -> dict[Option, list[str]]:
+        # values are separated by ; as colormap gradients and ranges use ,
+        grid = {}
+        for spec in specs:
+            if "=" not in spec:
+                raise ValueError(
+                    "Invalid sweep {}, expected option=value1;value2".format(spec)
+                )
+            name, values = spec.split("=", 1)
+            try:
+                option = Option(name.strip().lower())
+            except ValueError:
+                raise ValueError("Unknown sweep option {}".format(name))
+            values = [value.strip() for value in values.split(";") if value.strip()]
+            if values == [cls.WILDCARD] and option in cls.EXPANSIONS:
+                values = cls.EXPANSIONS[option]()
+            if len(values) == 0:
+                raise ValueError("No values given for sweep option {}".format(name))
+            grid[option] = values
+        return grid
+
+    @classmethod
+    def get_filename(
+        cls, prefix: str, overrides: dict[Option, str], output_format: str = "png"
+    ) -> str:
+        parts = [prefix] + [
+            "{}-{}".format(option.value, value) for option, value in overrides.items()
+        ]
+        name = "_".join(parts)
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return "{}.{}".format(name, output_format)
+
+    def get_variants(
+        self,
+        grid: dict[Option, list[str]],
+        output_dir: str,
+        prefix: str,
+        output_format: str = "png",
+    ) -> list[SweepVariant]:
+        variants = []
+        for values in itertools.product(*grid.values()):
+            overrides = dict(zip(grid.keys(), values))
+            output_file = os.path.join(
+                output_dir, self.get_filename(prefix, overrides, output_format)
+            )
+            variants.append(SweepVariant(overrides, output_file))
+        return variants
+
+    def render_serial(self, variants: list[SweepVariant], sink: ImageSink) -> int:
+        template = Plotter.create_template()
+        failed = 0
+        try:
+            for variant in variants:
+                try:
+                    Plotter(
+                        self.surface,
+                        variant.output_file,
+                        variant.apply(self.options),
+                        template=template,
+                        sink=sink,
+                    ).plot()
+                except Exception as e:
+                    failed += 1
+                    logger.error(
+                        "Error rendering variant: {} {}".format(variant.get_name(), e)
+                    )
+        finally:
+            template.close()
+        return failed
+
+    def render_parallel(self, variants: list[SweepVariant]) -> int:
+        failed = 0
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.surface,),
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _render_worker, variant.output_file, variant.apply(self.options)
+                ): variant
+                for variant in variants
+            }
+            for future in as_completed(futures):
+                try:
+                    logger.info("Rendered {}".format(future.result()))
+                except Exception as e:
+                    failed += 1
+                    logger.error(
+                        "Error rendering variant: {} {}".format(
+                            futures[future].get_name(), e
+                        )
+                    )
+        return failed
+
+    def run(
+        self,
+        grid: dict[Option, list[str]],
+        output_dir: str,
+        prefix: str,
+        sink: ImageSink = None,
+        output_format: str = "png",
+    ) -> None:
+        variants = self.get_variants(grid, output_dir, prefix, output_format)
+        logger.info(
+            "Sweeping {} variants of {} over {}".format(
+                len(variants),
+                prefix,
+                ", ".join(option.value for option in grid),
+            )
+        )
+        # a sink collects figures in order, so it is always fed from this process
+        if sink is not None or self.workers == 1 or len(variants) == 1:
+            failed = self.render_serial(variants, sink)
+        else:
+            failed = self.render_parallel(variants)
+        logger.info(
+            "Rendered {} of {} variants".format(len(variants) - failed, len(variants))
+        )
@@ -0,0 +1,116 @@
+import os
+from typing import Hashable
+
+import numpy as np
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class PathSimplifier:
+    # reduces reaction curves to fewer vertices for vector (SVG/PDF) output
+    def __init__(self, tolerance: float = 0.0, budget: int = 0):
+        # tolerance in display pixels, a budget of 0 leaves the vertex count free
+        self._tolerance = tolerance
+        self._budget = budget
+
+    @property
+    def tolerance(self) -> float:
+        return self._tolerance
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @classmethod
+    def get_importance(cls, points: np.ndarray) -> np.ndarray:
+        # largest tolerance at which each vertex of an (n, 2) polyline is kept
+        n = len(points)
+        importance = np.full(n, np.inf)
+        if n <= 2:
+            return importance
+        importance[1:-1] = -1.0
+        # a vertex survives only while every split above it survives, so it
+        # inherits the smallest distance on its way down the recursion
+        stack = [(0, n - 1, np.inf)]
+        while len(stack) > 0:
+            start, end, bound = stack.pop()
+            if end - start < 2:
+                continue
+            segment = points[end] - points[start]
+            offsets = points[start + 1 : end] - points[start]
+            length = np.hypot(*segment)
+            if length == 0:
+                distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            else:
+                distances = (
+                    np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0])
+                    / length
+                )
+            split = start + 1 + int(np.argmax(distances))
+            value = min(bound, float(distances[split - start - 1]))
+            importance[split] = value
+            stack.append((start, split, value))
+            stack.append((split, end, value))
+        return importance
+
+    def get_threshold(self, importances: list[np.ndarray]) -> float:
+        if self.budget <= 0:
+            return self.tolerance
+        values = np.concatenate(importances)
+        if len(values) <= self.budget:
+            return self.tolerance
+        budget = self.budget
+        minimum = 2 * len(importances)
+        if budget < minimum:
+            logger.warning(
+                "Vertex budget {} is below the {} curve end points".format(
+                    budget, minimum
+                )
+            )
+            # end points are always kept
+            budget = minimum
+            if len(values) <= budget:
+                return self.tolerance
+        # the budget-th most important vertex sets the tolerance for every curve
+        threshold = np.partition(values, len(values) - budget - 1)[
+            len(values) - budget - 1
+        ]
+        return max(self.tolerance, float(threshold))
+
+    def simplify(self, curves: list[np.ndarray]) -> list[np.ndarray]:
+        # mask of the kept vertices of each curve, in display coordinates
+        if len(curves) == 0:
+            return []
+        importances = [self.get_importance(points) for points in curves]
+        threshold = self.get_threshold(importances)
+        masks = [importance > threshold for importance in importances]
+        before = sum(len(points) for points in curves)
+        after = sum(int(mask.sum()) for mask in masks)
+        logger.info(
+            "Simplified {} curves from {} to {} vertices, tolerance {:.3f} px".format(
+                len(curves), before, after, threshold
+            )
+        )
+        return masks
+
+    @classmethod
+    def merge(
+        cls,
+        keys: list[Hashable],
+        x: list[np.ndarray],
+        y: list[np.ndarray],
+    ) -> dict[Hashable, tuple[np.ndarray, np.ndarray]]:
+        # joins curves sharing a key into one NaN-separated path
+        groups: dict[Hashable, list[int]] = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(key, []).append(i)
+        merged = {}
+        for key, indices in groups.items():
+            gap = np.array([np.nan])
+            merged[key] = (
+                np.concatenate([part for i in indices for part in (x[i], gap)])[:-1],
+                np.concatenate([part for i in indices for part in (y[i], gap)])[:-1],
+            )
+        return merged
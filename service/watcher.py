@@ -0,0 +1,150 @@
+import os
+import time
+from typing import Callable, Optional
+
+from domain.options import OptionsManager
+from domain.pes import PES
+from service.grid import PESGridEnhancer
+from service.logging import Log
+from service.parser import PESInputFileParser
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class WatchedInput:
+    # keeps the curves while only reactionFormat or global sections change
+    def __init__(self, filename: str):
+        self._filename = filename
+        self._mtime: Optional[float] = None
+        self._sections: Optional[dict] = None
+        self._surface: Optional[PES] = None
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def mtime(self) -> Optional[float]:
+        return self._mtime
+
+    @mtime.setter
+    def mtime(self, mtime: float):
+        self._mtime = mtime
+
+    @property
+    def sections(self) -> Optional[dict]:
+        return self._sections
+
+    @property
+    def surface(self) -> Optional[PES]:
+        return self._surface
+
+    def update(self, sections: dict) -> tuple[bool, PES, OptionsManager]:
+        # whether anything changed, the (possibly cached) surface and new options
+        if sections == self._sections:
+            return False, self._surface, None
+
+        pes_changed = self._sections is None or sections.get(
+            "pes"
+        ) != self._sections.get("pes")
+        if pes_changed:
+            logger.info("PES changed in {}, rebuilding curves".format(self.filename))
+            surface = PES.from_dataframe(
+                PESInputFileParser.dataframe_from_sections(sections)
+            )
+            PESGridEnhancer.enhance_surface(surface)
+        else:
+            logger.info(
+                "Only formatting changed in {}, re-using curves".format(self.filename)
+            )
+            surface = self._surface
+
+        opt_mgr = PESInputFileParser.options_from_sections(sections)
+        self._sections, self._surface = sections, surface
+        return True, surface, opt_mgr
+
+
+class InputWatcher:
+    # re-renders files once unchanged for debounce seconds
+    def __init__(
+        self,
+        path: str,
+        render: Callable[[str, PES, OptionsManager], None],
+        interval: float = 0.5,
+        debounce: float = 0.5,
+    ):
+        self._path = path
+        self._render = render
+        self._interval = interval
+        self._debounce = debounce
+        self._inputs: dict[str, WatchedInput] = {}
+        self._pending: dict[str, float] = {}
+        self._parser = PESInputFileParser()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def inputs(self) -> dict[str, WatchedInput]:
+        return self._inputs
+
+    def list_files(self) -> list[str]:
+        if os.path.isdir(self.path):
+            return sorted(
+                entry.path
+                for entry in os.scandir(self.path)
+                if entry.is_file() and entry.name.endswith(".dat")
+            )
+        return [self.path] if os.path.isfile(self.path) else []
+
+    def poll(self) -> None:
+        now = time.monotonic()
+        files = self.list_files()
+        for file in set(self.inputs) - set(files):
+            logger.info("Stopped watching removed file {}".format(file))
+            self.inputs.pop(file)
+            self._pending.pop(file, None)
+
+        for file in files:
+            try:
+                mtime = os.stat(file).st_mtime
+            except FileNotFoundError:
+                continue
+            watched = self.inputs.setdefault(file, WatchedInput(file))
+            if watched.mtime != mtime:
+                watched.mtime = mtime
+                self._pending[file] = now
+
+    def process(self, file: str) -> None:
+        try:
+            sections = self._parser.read_sections(file)
+            changed, surface, opt_mgr = self.inputs[file].update(sections)
+            if changed:
+                self._render(file, surface, opt_mgr)
+            else:
+                logger.info("No changes to content of {}".format(file))
+        except (Exception, SystemExit) as e:
+            # a bad edit must not end the watch, the next save will retry
+            logger.error("Error processing file: {} {}".format(file, e))
+
+    def step(self) -> None:
+        self.poll()
+        now = time.monotonic()
+        ready = [f for f, seen in self._pending.items() if now - seen >= self._debounce]
+        for file in sorted(ready):
+            self._pending.pop(file)
+            self.process(file)
+
+    def run(self) -> None:
+        logger.info(
+            "Watching {} (poll every {}s, debounce {}s), press Ctrl+C to stop".format(
+                self.path, self._interval, self._debounce
+            )
+        )
+        try:
+            while True:
+                self.step()
+                time.sleep(self._interval)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching {}".format(self.path))
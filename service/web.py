@@ -0,0 +1,354 @@
+import html
+import json
+import os
+import re
+
+import numpy as np
+from matplotlib.colors import to_hex
+
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+class WebDocumentWriter:
+    # JSON document of precomputed curves and labels, or an HTML page drawing it
+    FORMATS = [".html", ".json"]
+
+    # matplotlib linestyles as canvas dash patterns, in pixels
+    DASHES = {
+        "-": [],
+        "--": [6, 4],
+        ":": [1, 3],
+        "-.": [6, 3, 1, 3],
+        "solid": [],
+        "dashed": [6, 4],
+        "dotted": [1, 3],
+        "dashdot": [6, 3, 1, 3],
+    }
+    NO_LINE = ["None", "none", " ", ""]
+
+    # decimals kept for curve coordinates, well below one pixel at any zoom
+    PRECISION = 3
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def is_web_output(cls, filename: str) -> bool:
+        return os.path.splitext(filename)[-1].lower() in cls.FORMATS
+
+    @classmethod
+    def to_hex(cls, color: any) -> str:
+        return to_hex(color, keep_alpha=False)
+
+    @classmethod
+    def to_list(cls, values: np.ndarray) -> list[float]:
+        return np.round(np.asarray(values, dtype=float), cls.PRECISION).tolist()
+
+    @classmethod
+    def get_curves(cls, plotter: any) -> list[dict]:
+        style = plotter.compile_style()
+        alpha = (
+            style.settings.density_alpha
+            if style.settings.render_mode == "density"
+            else 1.0
+        )
+        curves = []
+        for channel in plotter.get_channels():
+            rxn, i = channel.lowest, channel.lowest_index
+            curves.append(
+                {
+                    "name": rxn.get_name(),
+                    "x": cls.to_list(rxn.x_coords),
+                    "y": cls.to_list(rxn.y_coords),
+                    "color": cls.to_hex(style.colors[i]),
+                    # matplotlib draws nothing for these, nor does the canvas
+                    "alpha": 0.0 if style.linestyles[i] in cls.NO_LINE else alpha,
+                    "width": float(style.linewidths[i]),
+                    "dash": cls.DASHES.get(style.linestyles[i], []),
+                }
+            )
+        return curves
+
+    @classmethod
+    def get_bands(cls, plotter: any) -> list[dict]:
+        style = plotter.compile_style()
+        bands = []
+        for channel in plotter.get_channels():
+            if len(channel.hidden) == 0:
+                continue
+            band = {
+                "color": cls.to_hex(style.colors[channel.lowest_index]),
+                "x": channel.lowest.ts.rxn_coord,
+                "y": channel.lowest.ts.energy,
+                "hidden": len(channel.hidden),
+            }
+            if style.settings.lod == "envelope":
+                x, lower, upper = channel.get_envelope()
+                band["envelope"] = {
+                    "x": cls.to_list(x),
+                    "lower": cls.to_list(lower),
+                    "upper": cls.to_list(upper),
+                }
+            bands.append(band)
+        return bands
+
+    @classmethod
+    def get_labels(cls, plotter: any) -> list[dict]:
+        return [
+            {
+                "text": label.text,
+                "xy": list(label.xy),
+                "xytext": list(label.xytext),
+                "va": label.va,
+                "color": cls.to_hex(label.color),
+                "fontsize": label.fontsize if label.fontsize is not None else 10,
+                "arrow": label.arrow,
+                "box": label.box,
+            }
+            for label in plotter.get_labels()
+        ]
+
+    @classmethod
+    def build(cls, plotter: any) -> dict:
+        style = plotter.compile_style()
+        labels = cls.get_labels(plotter)
+        bands = cls.get_bands(plotter)
+        # the same text positions matplotlib would see in axis.texts
+        positions = [tuple(label["xytext"]) for label in labels]
+        positions += [(band["x"], band["y"]) for band in bands]
+        xlim, ylim = plotter.get_limits(positions)
+        return {
+            "xlabel": "Reaction Coordinate / arb. units",
+            "ylabel": "Energy / kJ mol⁻¹",
+            "xlim": [float(v) for v in xlim],
+            "ylim": [float(v) for v in ylim],
+            "font": style.settings.label_font,
+            "curves": cls.get_curves(plotter),
+            "bands": bands,
+            "labels": labels,
+        }
+
+    @classmethod
+    def to_html(cls, document: dict, title: str) -> str:
+        # "</" is escaped so a species name can never close the script element
+        data = json.dumps(document, separators=(",", ":")).replace("</", "<\\/")
+        values = {"__TITLE__": html.escape(title), "__DATA__": data}
+        # one pass, so neither value is searched for the other's placeholder
+        return re.sub("__TITLE__|__DATA__", lambda m: values[m.group(0)], HTML_TEMPLATE)
+
+    @classmethod
+    def write(cls, plotter: any, output_file: str) -> None:
+        document = cls.build(plotter)
+        logger.info(
+            "Writing {} curves and {} labels to {}".format(
+                len(document["curves"]), len(document["labels"]), output_file
+            )
+        )
+        if output_file.lower().endswith(".json"):
+            text = json.dumps(document, separators=(",", ":"))
+        else:
+            title = os.path.splitext(os.path.basename(output_file))[0]
+            text = cls.to_html(document, title)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  html, body { margin: 0; height: 100%; background: #fff; }
+  canvas { display: block; width: 100%; height: 100%; cursor: grab; }
+</style>
+</head>
+<body>
+<canvas id="pes"></canvas>
+<script>
+const doc = __DATA__;
+const canvas = document.getElementById("pes");
+const ctx = canvas.getContext("2d");
+const margin = { left: 70, right: 20, top: 20, bottom: 50 };
+let view = { x: doc.xlim.slice(), y: doc.ylim.slice() };
+
+function px(x) {
+  const w = canvas.clientWidth - margin.left - margin.right;
+  return margin.left + (x - view.x[0]) / (view.x[1] - view.x[0]) * w;
+}
+
+function py(y) {
+  const h = canvas.clientHeight - margin.top - margin.bottom;
+  return margin.top + (view.y[1] - y) / (view.y[1] - view.y[0]) * h;
+}
+
+function ticks(lo, hi, n) {
+  const raw = (hi - lo) / n;
+  const mag = Math.pow(10, Math.floor(Math.log10(raw)));
+  const step = [1, 2, 5, 10].map(s => s * mag).find(s => s >= raw);
+  const out = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi; t += step) {
+    out.push(Math.abs(t) < step * 1e-9 ? 0 : t);
+  }
+  return out;
+}
+
+function drawAxes() {
+  const w = canvas.clientWidth, h = canvas.clientHeight;
+  ctx.strokeStyle = "#000";
+  ctx.lineWidth = 1;
+  ctx.setLineDash([]);
+  ctx.strokeRect(margin.left, margin.top,
+    w - margin.left - margin.right, h - margin.top - margin.bottom);
+  ctx.fillStyle = "#000";
+  ctx.font = "11px sans-serif";
+  ctx.textAlign = "center";
+  ctx.textBaseline = "top";
+  for (const t of ticks(view.x[0], view.x[1], 8)) {
+    ctx.fillText(+t.toPrecision(6), px(t), h - margin.bottom + 4);
+  }
+  ctx.textAlign = "right";
+  ctx.textBaseline = "middle";
+  for (const t of ticks(view.y[0], view.y[1], 8)) {
+    ctx.fillText(+t.toPrecision(6), margin.left - 4, py(t));
+  }
+  ctx.font = "13px sans-serif";
+  ctx.textAlign = "center";
+  ctx.textBaseline = "bottom";
+  ctx.fillText(doc.xlabel, margin.left + (w - margin.left - margin.right) / 2, h - 8);
+  ctx.save();
+  ctx.translate(16, margin.top + (h - margin.top - margin.bottom) / 2);
+  ctx.rotate(-Math.PI / 2);
+  ctx.textBaseline = "top";
+  ctx.fillText(doc.ylabel, 0, 0);
+  ctx.restore();
+}
+
+function drawBands() {
+  for (const b of doc.bands) {
+    if (b.envelope) {
+      const e = b.envelope;
+      ctx.globalAlpha = 0.2;
+      ctx.fillStyle = b.color;
+      ctx.beginPath();
+      e.x.forEach((x, i) => ctx.lineTo(px(x), py(e.upper[i])));
+      for (let i = e.x.length - 1; i >= 0; i--) ctx.lineTo(px(e.x[i]), py(e.lower[i]));
+      ctx.fill();
+      ctx.globalAlpha = 1;
+    }
+    ctx.fillStyle = b.color;
+    ctx.font = "7pt " + doc.font;
+    ctx.textAlign = "left";
+    ctx.textBaseline = "bottom";
+    ctx.fillText(" +" + b.hidden, px(b.x), py(b.y));
+  }
+}
+
+function drawCurves() {
+  for (const c of doc.curves) {
+    ctx.globalAlpha = c.alpha;
+    ctx.strokeStyle = c.color;
+    ctx.lineWidth = c.width;
+    ctx.setLineDash(c.dash);
+    ctx.beginPath();
+    c.x.forEach((x, i) => ctx.lineTo(px(x), py(c.y[i])));
+    ctx.stroke();
+  }
+  ctx.globalAlpha = 1;
+  ctx.setLineDash([]);
+}
+
+function drawLabels() {
+  for (const l of doc.labels) {
+    ctx.font = l.fontsize + "pt " + doc.font;
+    ctx.textAlign = "center";
+    ctx.textBaseline = l.va === "center" ? "middle" : l.va;
+    const x = px(l.xytext[0]), y = py(l.xytext[1]);
+    if (l.arrow) {
+      ctx.strokeStyle = "#000";
+      ctx.lineWidth = 1;
+      const tx = px(l.xy[0]), ty = py(l.xy[1]);
+      const a = Math.atan2(ty - y, tx - x);
+      ctx.beginPath();
+      ctx.moveTo(x, y);
+      ctx.lineTo(tx, ty);
+      ctx.moveTo(tx - 6 * Math.cos(a - 0.4), ty - 6 * Math.sin(a - 0.4));
+      ctx.lineTo(tx, ty);
+      ctx.lineTo(tx - 6 * Math.cos(a + 0.4), ty - 6 * Math.sin(a + 0.4));
+      ctx.stroke();
+    }
+    if (l.box) {
+      const m = ctx.measureText(l.text);
+      const h = l.fontsize * 1.6;
+      ctx.fillStyle = "#fff";
+      ctx.strokeStyle = l.color;
+      ctx.lineWidth = 1;
+      ctx.beginPath();
+      ctx.roundRect(x - m.width / 2 - 2, y - h / 2, m.width + 4, h, 3);
+      ctx.fill();
+      ctx.stroke();
+    }
+    ctx.fillStyle = l.color;
+    ctx.fillText(l.text, x, y);
+  }
+}
+
+function draw() {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = canvas.clientWidth * ratio;
+  canvas.height = canvas.clientHeight * ratio;
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, canvas.clientWidth, canvas.clientHeight);
+  ctx.save();
+  ctx.beginPath();
+  ctx.rect(margin.left, margin.top, canvas.clientWidth - margin.left - margin.right,
+    canvas.clientHeight - margin.top - margin.bottom);
+  ctx.clip();
+  drawBands();
+  drawCurves();
+  drawLabels();
+  ctx.restore();
+  drawAxes();
+}
+
+function toData(e) {
+  const r = canvas.getBoundingClientRect();
+  const w = canvas.clientWidth - margin.left - margin.right;
+  const h = canvas.clientHeight - margin.top - margin.bottom;
+  return [
+    view.x[0] + (e.clientX - r.left - margin.left) / w * (view.x[1] - view.x[0]),
+    view.y[1] - (e.clientY - r.top - margin.top) / h * (view.y[1] - view.y[0]),
+  ];
+}
+
+canvas.addEventListener("wheel", e => {
+  e.preventDefault();
+  const [x, y] = toData(e);
+  const k = Math.exp(e.deltaY * 0.001);
+  view.x = view.x.map(v => x + (v - x) * k);
+  view.y = view.y.map(v => y + (v - y) * k);
+  draw();
+}, { passive: false });
+
+let drag = null;
+canvas.addEventListener("mousedown", e => { drag = toData(e); canvas.style.cursor = "grabbing"; });
+window.addEventListener("mouseup", () => { drag = null; canvas.style.cursor = "grab"; });
+canvas.addEventListener("mousemove", e => {
+  if (!drag) return;
+  const [x, y] = toData(e);
+  view.x = view.x.map(v => v + drag[0] - x);
+  view.y = view.y.map(v => v + drag[1] - y);
+  draw();
+});
+canvas.addEventListener("dblclick", () => {
+  view = { x: doc.xlim.slice(), y: doc.ylim.slice() };
+  draw();
+});
+window.addEventListener("resize", draw);
+draw();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,3 @@
+import os
+
+INPUTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "inputs")
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from domain.pes import PES
+from service.analysis import EnergeticSpanAnalyser
+from service.parser import PESInputFileParser
+
+
+def create_surface(lines: list[str]) -> PES:
+    sections = {"pes": ["name energy type reactant product"] + lines}
+    return PES.from_dataframe(PESInputFileParser.dataframe_from_sections(sections))
+
+
+CYCLE = [
+    "M1 0 MIN nan nan",
+    "TS1 50 TS M1 M2",
+    "M2 -10 MIN nan nan",
+    "TS2 60 TS M2 M3",
+    "M3 -30 MIN nan nan",
+]
+
+
+def get_rows(rows: list[dict], record: str) -> list[dict]:
+    return [row for row in rows if row["record"] == record]
+
+
+def test_pathway_span():
+    analyser = EnergeticSpanAnalyser()
+    rows = analyser.analyse("cycle", create_surface(CYCLE))
+    (pathway,) = get_rows(rows, "pathway")
+
+    # TS2 - M2 = 70 beats TS1 - M2 + dG_r = 50 + 10 - 30 and the spans from M1
+    assert pathway["tdi"] == "M2"
+    assert pathway["tdts"] == "TS2"
+    assert pathway["span"] == pytest.approx(70.0)
+    assert pathway["reaction_energy"] == pytest.approx(-30.0)
+    assert pathway["tof"] == pytest.approx(analyser.get_tof(70.0))
+
+
+def test_span_counts_turnover_when_ts_precedes_intermediate():
+    analyser = EnergeticSpanAnalyser()
+    surface = create_surface(
+        [
+            "M1 0 MIN nan nan",
+            "TS1 80 TS M1 M2",
+            "M2 -20 MIN nan nan",
+            "TS2 10 TS M2 M3",
+            "M3 -5 MIN nan nan",
+        ]
+    )
+    (pathway,) = get_rows(analyser.analyse("s", surface), "pathway")
+    # TS1 - M2 + dG_r = 80 + 20 - 5
+    assert (pathway["tdi"], pathway["tdts"]) == ("M2", "TS1")
+    assert pathway["span"] == pytest.approx(95.0)
+
+
+def test_network_combines_parallel_pathways():
+    analyser = EnergeticSpanAnalyser(temperature=350.0)
+    surface = create_surface(CYCLE + ["TS3 80 TS M1 M3"])
+    rows = analyser.analyse("cycle", surface)
+    (network,) = get_rows(rows, "network")
+    spans = sorted(row["span"] for row in get_rows(rows, "pathway"))
+    assert spans == pytest.approx([70.0, 80.0])
+
+    rt = analyser.GAS_CONSTANT * analyser.temperature
+    expected = -rt * np.log(np.exp(-70.0 / rt) + np.exp(-80.0 / rt))
+    assert network["span"] == pytest.approx(expected)
+    assert network["tof"] == pytest.approx(
+        analyser.get_tof(70.0) + analyser.get_tof(80.0)
+    )
+    assert network["tdts"] == "TS2"
+
+
+def test_high_barriers_stay_finite():
+    high = [line.replace(" 50 ", " 1950 ").replace(" 60 ", " 2030 ") for line in CYCLE]
+    analyser = EnergeticSpanAnalyser(samples=20, sigma=2.0, seed=1)
+    with np.errstate(divide="raise", invalid="raise"):
+        rows = analyser.analyse("high", create_surface(high + ["TS3 2100 TS M1 M3"]))
+    (network,) = get_rows(rows, "network")
+    assert np.isfinite(network["span"])
+    assert network["span"] < 2040.0
+    assert np.isfinite(network["span_std"]) and network["span_std"] > 0
+
+
+def test_unperturbed_samples():
+    analyser = EnergeticSpanAnalyser(samples=5, sigma=0.0, seed=3)
+    (pathway,) = get_rows(analyser.analyse("c", create_surface(CYCLE)), "pathway")
+    assert pathway["span_std"] == pytest.approx(0.0)
+    assert pathway["tdts_stability"] == 1.0
+
+
+def test_unknown_start():
+    with pytest.raises(ValueError, match="Unknown minimum M9"):
+        EnergeticSpanAnalyser().analyse("c", create_surface(CYCLE), start="M9")
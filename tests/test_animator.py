@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+
+from domain.pes import PES
+from service.animator import SurfaceAnimator
+from service.grid import PESGridEnhancer
+from service.parser import PESInputFileParser
+from service.plotter import Plotter
+from tests import INPUTS
+
+
+def create_animator(filename: str, path: list[str]) -> SurfaceAnimator:
+    data, options = PESInputFileParser().read_input_file(os.path.join(INPUTS, filename))
+    surface = PES.from_dataframe(data)
+    PESGridEnhancer.enhance_surface(surface)
+    return SurfaceAnimator(
+        Plotter(surface, "unused.png", options), mode="sweep", path=path
+    )
+
+
+def test_sweep_follows_path_backwards():
+    animator = create_animator("circular.dat", ["M1", "M2", "M3+M4", "M1"])
+    x, _, starts = animator.get_sweep_points()
+    legs = np.split(x, np.flatnonzero(starts)[1:])
+
+    assert len(legs) == 3
+    assert [leg[0] for leg in legs] == [1.0, 2.0, 3.0]
+    assert [leg[-1] for leg in legs] == [2.0, 3.0, 1.0]
+    assert np.all(np.diff(legs[2]) < 0)
+
+
+def test_sweep_keeps_last_point():
+    animator = create_animator("pes.dat", ["M1", "M2"])
+    x, y, _ = animator.get_sweep_points()
+    rxn, backwards = animator.get_path_reactions()[0]
+
+    assert not backwards
+    assert x[-1] == rxn.x_coords[-1]
+    assert y[-1] == rxn.y_coords[-1]
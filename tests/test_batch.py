@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from service.batch import BatchJob, BatchRunner
+from tests import INPUTS
+
+
+class CrashingJob(BatchJob):
+    # dies mid-job, as if killed by the out of memory killer
+    def run(self, template, encoder) -> None:
+        os._exit(1)
+
+
+@pytest.fixture
+def jobs(tmp_path) -> list[BatchJob]:
+    return [
+        BatchJob(os.path.join(INPUTS, name), str(tmp_path / (name + ".png")))
+        for name in ["pes.dat", "circular.dat", "labels.dat"]
+    ]
+
+
+def test_renders_all_jobs(jobs):
+    runner = BatchRunner()
+    results = runner.run(jobs)
+    assert [result["status"] for result in results] == ["ok"] * 3
+    assert runner.recycled == 0
+    assert len({result["pid"] for result in results}) == 1
+    assert all(os.path.isfile(job.output_file) for job in jobs)
+
+
+def test_recycles_worker_past_memory_ceiling(jobs):
+    runner = BatchRunner(max_rss_mb=1)
+    results = runner.run(jobs)
+    assert [result["status"] for result in results] == ["ok"] * 3
+    assert all(result["recycle"] for result in results)
+    assert runner.recycled == 3
+    assert len({result["pid"] for result in results}) == 3
+    assert all(os.path.isfile(job.output_file) for job in jobs)
+
+
+def test_missing_input_is_an_error(jobs, tmp_path):
+    missing = BatchJob(str(tmp_path / "missing.dat"), str(tmp_path / "missing.png"))
+    results = BatchRunner().run([missing] + jobs)
+    assert [result["status"] for result in results] == ["error"] + ["ok"] * 3
+    assert len({result["pid"] for result in results}) == 1
+
+
+def test_crashed_worker_is_replaced(jobs, tmp_path):
+    crashing = CrashingJob(str(tmp_path / "crash.dat"), str(tmp_path / "crash.png"))
+    runner = BatchRunner()
+    results = runner.run([jobs[0], crashing] + jobs[1:])
+    assert [result["status"] for result in results] == ["ok", "crashed", "ok", "ok"]
+    assert results[1]["file"] == "crash.dat"
+    assert "code 1" in results[1]["error"]
+    assert runner.recycled == 1
+    assert all(os.path.isfile(job.output_file) for job in jobs)
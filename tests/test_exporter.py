@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from domain.pes import PES
+from service.exporter import CurveExporter
+from service.grid import PESGridEnhancer
+from service.parser import PESInputFileParser
+from tests import INPUTS
+
+
+def load_surface(filename: str) -> PES:
+    data, _ = PESInputFileParser().read_input_file(os.path.join(INPUTS, filename))
+    surface = PES.from_dataframe(data)
+    PESGridEnhancer.enhance_surface(surface)
+    return surface
+
+
+@pytest.fixture(scope="module")
+def surfaces() -> dict[str, PES]:
+    return {name: load_surface(name + ".dat") for name in ["pes", "circular"]}
+
+
+@pytest.fixture
+def exporter(surfaces) -> CurveExporter:
+    exporter = CurveExporter()
+    for name, surface in surfaces.items():
+        exporter.add(name, surface)
+    return exporter
+
+
+def test_npz_round_trip(tmp_path, surfaces, exporter):
+    filename = str(tmp_path / "curves.npz")
+    exporter.write(filename)
+    arrays = np.load(filename)
+
+    reactions = [rxn for surface in surfaces.values() for rxn in surface.reactions]
+    points = [
+        sp for surface in surfaces.values() for sp in surface.get_stationary_points()
+    ]
+    assert list(arrays["sp_name"]) == [sp.name for sp in points]
+    assert np.array_equal(arrays["sp_energy"], [sp.energy for sp in points])
+    assert list(arrays["rxn_ts"]) == [rxn.ts.name for rxn in reactions]
+    assert np.array_equal(
+        arrays["rxn_x"], np.stack([rxn.x_coords for rxn in reactions])
+    )
+    assert np.array_equal(
+        arrays["rxn_y"], np.stack([rxn.y_coords for rxn in reactions])
+    )
+
+
+def test_csv_round_trip(tmp_path, surfaces, exporter):
+    filename = str(tmp_path / "curves.csv")
+    exporter.write(filename)
+    table = pd.read_csv(filename)
+
+    surface = surfaces["circular"]
+    points = table[
+        (table["surface"] == "circular") & (table["record"] == "stationary_point")
+    ]
+    assert list(points["name"]) == [sp.name for sp in surface.get_stationary_points()]
+    for rxn in surface.reactions:
+        curve = table[
+            (table["surface"] == "circular")
+            & (table["record"] == "curve")
+            & (table["name"] == rxn.ts.name)
+        ].sort_values("index")
+        assert list(curve[["reactant", "product"]].iloc[0]) == [
+            rxn.reac.name,
+            rxn.prod.name,
+        ]
+        assert np.allclose(curve["x"], rxn.x_coords)
+        assert np.allclose(curve["y"], rxn.y_coords)
+
+
+def test_parquet_round_trip(tmp_path, exporter):
+    pytest.importorskip("pyarrow")
+    filename = str(tmp_path / "curves.parquet")
+    exporter.write(filename)
+    assert pd.read_parquet(filename).equals(exporter.to_dataframe())
+
+
+def test_check_format_rejects_unknown_extension():
+    with pytest.raises(ValueError, match="Unsupported export format .txt"):
+        CurveExporter.check_format("curves.txt")
@@ -0,0 +1,94 @@
+import pytest
+
+from service.importer import EnergyReader, PESImporter, _read_energy
+
+GAUSSIAN = """ SCF Done:  E(RB3LYP) =  -100.500000000     A.U. after   10 cycles
+ SCF Done:  E(RB3LYP) =  -100.250000000     A.U. after    3 cycles
+ Sum of electronic and thermal Free Energies=          -100.200000
+"""
+ORCA = """FINAL SINGLE POINT ENERGY       -50.125000000000
+Final Gibbs free energy         ...    -50.100000 Eh
+"""
+XYZ = """2
+energy: -1.0
+H 0 0 0
+H 0 0 0.74
+2
+energy: -1.5
+H 0 0 0
+H 0 0 0.75
+"""
+
+
+def write(path, text: str) -> str:
+    path.write_text(text)
+    return str(path)
+
+
+def test_read_gaussian(tmp_path):
+    filename = write(tmp_path / "a.log", GAUSSIAN)
+    # the last energy of an optimisation is the final one
+    assert EnergyReader.read(filename) == -100.25
+    assert EnergyReader.read(filename, "free") == -100.2
+
+
+def test_read_orca(tmp_path):
+    filename = write(tmp_path / "a.out", ORCA)
+    assert EnergyReader.read(filename) == -50.125
+    assert EnergyReader.read(filename, "free") == -50.1
+
+
+def test_read_xyz_last_frame(tmp_path):
+    filename = write(tmp_path / "a.xyz", XYZ)
+    assert EnergyReader.read(filename) == -1.5
+    with pytest.raises(ValueError, match="electronic"):
+        EnergyReader.read(filename, "free")
+
+
+def test_read_fortran_exponent(tmp_path):
+    filename = write(tmp_path / "a.out", "FINAL SINGLE POINT ENERGY  -0.5D+02\n")
+    assert EnergyReader.read(filename) == -50.0
+
+
+def test_read_tail_grows_window(tmp_path):
+    padding = "x" * (3 * EnergyReader.TAIL_BYTES) + "\n"
+    filename = write(tmp_path / "a.log", GAUSSIAN + padding)
+    assert EnergyReader.read(filename) == -100.25
+
+
+def test_missing_energy(tmp_path):
+    filename = write(tmp_path / "a.log", "Normal termination\n")
+    with pytest.raises(ValueError, match="No electronic energy"):
+        EnergyReader.read(filename)
+    _, energy, error = _read_energy(str(tmp_path / "missing.log"), "electronic")
+    assert energy is None and error != ""
+
+
+def test_import_converts_relative_energies(tmp_path):
+    write(tmp_path / "m1.log", " SCF Done:  E(RB3LYP) =  -100.0  A.U.\n")
+    write(tmp_path / "ts1.out", "FINAL SINGLE POINT ENERGY  -99.99\n")
+    write(tmp_path / "a.log", " SCF Done:  E(RB3LYP) =  -60.0  A.U.\n")
+    write(tmp_path / "b.log", " SCF Done:  E(RB3LYP) =  -40.005  A.U.\n")
+    mapping = write(
+        tmp_path / "mapping.txt",
+        "name type reactant product file\n"
+        "M1 MIN nan nan\n"
+        "TS1 TS M1 M2\n"
+        "M2 MIN nan nan a.log+b.log\n",
+    )
+    data = PESImporter(str(tmp_path), mapping).get_dataframe()
+    energies = dict(zip(data["name"], data["energy"]))
+    assert energies == {
+        "M1": 0.0,
+        "TS1": round(0.01 * EnergyReader.HARTREE_TO_KJ_MOL, 2),
+        "M2": round(-0.005 * EnergyReader.HARTREE_TO_KJ_MOL, 2),
+    }
+
+
+def test_import_rejects_unknown_minimum(tmp_path):
+    mapping = write(
+        tmp_path / "mapping.txt",
+        "name type reactant product\nM1 MIN nan nan\nTS1 TS M1 M9\n",
+    )
+    with pytest.raises(ValueError, match="unknown minimum M9"):
+        PESImporter(str(tmp_path), mapping).get_dataframe()
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from service.parser import PESBundleParser, PESInputFileParser
+
+
+def test_missing_energy_column_raises():
+    sections = {"pes": ["name type reactant product", "M1 MIN nan nan"]}
+    with pytest.raises(ValueError, match="No energy column"):
+        PESInputFileParser.dataframe_from_sections(sections)
+
+
+PES_LINES = [
+    "name energy type reactant product",
+    "M1 0 MIN nan nan",
+    "TS1 10 TS M1 M2",
+    "M2 -5 MIN nan nan",
+]
+
+
+def read_bundle(path, lines: list[str]) -> list[tuple[str, dict]]:
+    path.write_text("\n".join(lines) + "\n")
+    return list(PESBundleParser(str(path)).surfaces())
+
+
+def test_bundle_skips_malformed_json_records(tmp_path):
+    valid = json.dumps({"name": "good", "pes": PES_LINES})
+    surfaces = read_bundle(
+        tmp_path / "bundle.jsonl",
+        [
+            "{not json",
+            '["a", "b"]',
+            "3",
+            json.dumps({"name": "text", "pes": "M1 0 MIN nan nan"}),
+            json.dumps({"name": "numbers", "pes": [1, 2]}),
+            json.dumps({"name": "columns", "pes": [{"name": "M1"}, {"type": "MIN"}]}),
+            "",
+            valid,
+        ],
+    )
+    assert [name for name, _ in surfaces] == ["good"]
+    assert surfaces[0][1]["pes"] == PES_LINES
+
+
+def test_bundle_reads_rows_as_objects(tmp_path):
+    rows = [dict(zip(PES_LINES[0].split(), line.split())) for line in PES_LINES[1:]]
+    surfaces = read_bundle(tmp_path / "bundle.jsonl", [json.dumps({"pes": rows})])
+    name, sections = surfaces[0]
+    assert name == "surface-1"
+    assert len(PESInputFileParser.dataframe_from_sections(sections)) == 3
+
+
+def test_bundle_ignores_unnamed_text_section(tmp_path):
+    surfaces = read_bundle(
+        tmp_path / "surfaces.bundle",
+        ["section: pes first"] + PES_LINES + ["section:", "ignored", "section: global"],
+    )
+    assert [name for name, _ in surfaces] == ["first"]
+    assert surfaces[0][1] == {"pes": PES_LINES, "global": []}
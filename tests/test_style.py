@@ -0,0 +1,74 @@
+import pytest
+
+from domain.pes import PES
+from service.parser import PESInputFileParser
+from service.style import StyleCompiler, StyleTable
+
+PES_LINES = [
+    "name energy type reactant product",
+    "M1 0 MIN nan nan",
+    "TS1 10 TS M1 M2",
+    "M2 -5 MIN nan nan",
+    "TS2 20 TS M2 M3",
+    "M3 0 MIN nan nan",
+]
+
+
+def compile_style(reaction_format: list[str], global_format: list[str]) -> StyleTable:
+    sections = {
+        "pes": PES_LINES,
+        "reactionFormat": reaction_format,
+        "global": global_format,
+    }
+    surface = PES.from_dataframe(PESInputFileParser.dataframe_from_sections(sections))
+    options = PESInputFileParser.options_from_sections(sections)
+    return StyleCompiler.compile(surface, options)
+
+
+def test_compile_defaults():
+    style = compile_style([], [])
+    assert list(style.linestyles) == ["-", "-"]
+    assert list(style.linewidths) == [1.0, 1.0]
+    assert style.settings.resolution == 1200
+    assert style.settings.render_mode == "lines"
+
+
+@pytest.mark.parametrize("linestyle", ["--", "dashed", ":", "None", "none"])
+def test_compile_accepts_matplotlib_linestyles(linestyle):
+    style = compile_style(["TS2 linestyle {}".format(linestyle)], [])
+    assert style.linestyles[1] == linestyle
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "TS1 linestyle wavy",
+        "TS1 color notacolor",
+        "TS1 linewidth -1",
+        "TS1 linewidth thick",
+    ],
+)
+def test_compile_rejects_reaction_options(line):
+    with pytest.raises(ValueError, match="Invalid value .* for TS1"):
+        compile_style([line], [])
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "resolution 0",
+        "resolution high",
+        "colormap not-a-colormap",
+        "colormap-range 0.2",
+        "colormap-range 0.2,1.5",
+        "label-loc above",
+        "pad-bimolecular yes",
+        "density-alpha 2",
+        "compression 10",
+        "quality 0",
+    ],
+)
+def test_compile_rejects_global_options(line):
+    option = line.split()[0]
+    with pytest.raises(ValueError, match="for option {}".format(option)):
+        compile_style([], [line])
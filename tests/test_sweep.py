@@ -0,0 +1,41 @@
+import pytest
+
+from domain.options import Option
+from service.sweep import OptionSweep
+
+
+def test_parse_grid():
+    grid = OptionSweep.parse_grid(
+        ["colormap=viridis; plasma;#FF5733,#3375FF", "Label-Loc=offset"]
+    )
+    assert grid == {
+        Option.COLORMAP: ["viridis", "plasma", "#FF5733,#3375FF"],
+        Option.LABEL_LOCATION: ["offset"],
+    }
+
+
+def test_parse_grid_expands_wildcard():
+    grid = OptionSweep.parse_grid(["colormap=all"])
+    assert "viridis" in grid[Option.COLORMAP]
+    assert len(grid[Option.COLORMAP]) > 1
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    [
+        ("colormap", "expected option=value1;value2"),
+        ("nonsense=1", "Unknown sweep option"),
+        ("colormap= ; ", "No values given"),
+    ],
+)
+def test_parse_grid_rejects_invalid_specs(spec, message):
+    with pytest.raises(ValueError, match=message):
+        OptionSweep.parse_grid([spec])
+
+
+def test_get_filename_uses_output_format():
+    overrides = {Option.COLORMAP: "#FF5733,#3375FF"}
+    assert (
+        OptionSweep.get_filename("pes", overrides) == "pes_colormap-_FF5733__3375FF.png"
+    )
+    assert OptionSweep.get_filename("pes", overrides, "svg").endswith(".svg")
@@ -0,0 +1,74 @@
+import numpy as np
+
+from service.vector import PathSimplifier
+
+
+def make_curves() -> list[np.ndarray]:
+    x = np.linspace(0, 100, 200)
+    return [
+        np.column_stack([x, 20 * np.sin(x / 10)]),
+        np.column_stack([x, 10 * np.cos(x / 7) + 50]),
+    ]
+
+
+def test_end_points_always_kept():
+    importance = PathSimplifier.get_importance(make_curves()[0])
+    assert np.isinf(importance[0]) and np.isinf(importance[-1])
+    assert np.all(np.isfinite(importance[1:-1]))
+
+
+def test_straight_line_drops_inner_points():
+    points = np.column_stack([np.arange(10.0), np.arange(10.0)])
+    (mask,) = PathSimplifier(tolerance=0.01).simplify([points])
+    assert mask.tolist() == [True] + [False] * 8 + [True]
+
+
+def test_no_tolerance_or_budget_keeps_curved_points():
+    curves = make_curves()
+    masks = PathSimplifier().simplify(curves)
+    assert all(mask.all() for mask in masks)
+
+
+def test_tolerance_bounds_error():
+    points = make_curves()[0]
+    (mask,) = PathSimplifier(tolerance=0.5).simplify([points])
+    assert mask.sum() < len(points)
+    # every dropped vertex lies within the tolerance of its simplified segment
+    kept = np.flatnonzero(mask)
+    for start, end in zip(kept[:-1], kept[1:]):
+        segment = points[end] - points[start]
+        offsets = points[start + 1 : end] - points[start]
+        distances = np.abs(
+            segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]
+        ) / np.hypot(*segment)
+        assert np.all(distances <= 0.5)
+
+
+def test_budget_limits_total_vertices():
+    curves = make_curves()
+    for budget in [10, 25, 100]:
+        masks = PathSimplifier(budget=budget).simplify(curves)
+        assert sum(int(mask.sum()) for mask in masks) <= budget
+        assert all(mask[0] and mask[-1] for mask in masks)
+
+
+def test_budget_above_vertex_count_keeps_all():
+    curves = make_curves()
+    masks = PathSimplifier(budget=1000).simplify(curves)
+    assert all(mask.all() for mask in masks)
+
+
+def test_budget_below_end_points_keeps_end_points():
+    masks = PathSimplifier(budget=1).simplify(make_curves())
+    assert [int(mask.sum()) for mask in masks] == [2, 2]
+
+
+def test_merge_separates_paths_with_nan():
+    x = [np.array([0.0, 1.0]), np.array([2.0, 3.0]), np.array([4.0])]
+    y = [np.array([5.0, 6.0]), np.array([7.0, 8.0]), np.array([9.0])]
+    merged = PathSimplifier.merge(["a", "b", "a"], x, y)
+    assert set(merged) == {"a", "b"}
+    mx, my = merged["a"]
+    np.testing.assert_array_equal(mx, [0.0, 1.0, np.nan, 4.0])
+    np.testing.assert_array_equal(my, [5.0, 6.0, np.nan, 9.0])
+    np.testing.assert_array_equal(merged["b"][0], [2.0, 3.0])
@@ -0,0 +1,37 @@
+import math
+import os
+
+import matplotlib.pyplot as plt
+
+from service.fonts import FontRegistry
+from service.logging import Log
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+
+def run(output_filename: str = "fonts.png", columns: int = 3, dpi: int = 150):
+    # every font is drawn in a single figure, the name in the fallback font
+    # so symbol fonts stay identifiable, then a sample label in the font itself
+    fonts = FontRegistry.get_font_names()
+    rows = math.ceil(len(fonts) / columns)
+    figure = plt.figure(figsize=(4 * columns, 0.6 * rows + 0.5))
+    for i, font in enumerate(fonts):
+        column, row = divmod(i, rows)
+        x = (column + 0.05) / columns
+        y = 1 - (row + 0.75) / (rows + 0.5)
+        figure.text(x, y, font, fontsize=7, color="grey", va="bottom")
+        figure.text(
+            x,
+            y,
+            "M1 (0.0) TS1 (20.0)",
+            fontproperties=FontRegistry.get_properties(font),
+            fontsize=11,
+            va="top",
+        )
+    logger.info("Writing gallery of {} fonts to {}".format(len(fonts), output_filename))
+    figure.savefig(output_filename, dpi=dpi)
+    plt.close(figure)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,7 +1,6 @@
 import os
 
-from matplotlib import font_manager
-
+from service.fonts import FontRegistry
 from service.logging import Log
 from service.writer import PlainTextWriter
 
@@ -9,11 +8,12 @@ logger = Log.get_logger(os.path.basename(__file__))
 
 
 def run():
-    available_fonts = sorted([f for f in font_manager.fontManager.get_font_names()])
+    available_fonts = list(FontRegistry.get_font_names())
     for font in available_fonts:
         logger.info("Font: {}".format(font))
     w = PlainTextWriter(available_fonts)
     w.write("fonts.txt")
+    return available_fonts
 
 
 if __name__ == "__main__":
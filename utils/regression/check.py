@@ -0,0 +1,241 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import numpy as np
+from PIL import Image, ImageFilter
+
+from domain.options import Option
+from domain.pes import PES
+from service.grid import PESGridEnhancer
+from service.logging import Log
+from service.parser import PESInputFileParser
+from service.plotter import Plotter
+from service.sweep import SweepVariant
+
+logger = Log.get_logger(os.path.basename(__file__))
+
+# baselines are rendered at 1200 dpi, both images are compared at the test dpi
+# after a light blur, which hides anti-aliasing differences between resolutions
+BLUR_RADIUS = 1.0
+
+
+def load_image(filename: str, size: tuple[int, int] = None) -> np.ndarray:
+    with Image.open(filename) as image:
+        image = image.convert("RGB")
+        if size is not None and image.size != size:
+            image = image.resize(size, Image.Resampling.BOX, reducing_gap=3.0)
+        image = image.filter(ImageFilter.GaussianBlur(BLUR_RADIUS))
+        return np.asarray(image, dtype=np.float32) / 255.0
+
+
+def compare_images(rendered: str, baseline: str, tolerance: float) -> dict:
+    # mean and max pixel difference, and the share of pixels over tolerance
+    image = load_image(rendered)
+    reference = load_image(baseline, size=(image.shape[1], image.shape[0]))
+    delta = np.abs(image - reference).max(axis=2)
+    return {
+        "mean_delta": float(delta.mean()),
+        "max_delta": float(delta.max()),
+        "changed": float(np.mean(delta > tolerance)),
+    }
+
+
+def write_diff(rendered: str, baseline: str, filename: str) -> None:
+    image = load_image(rendered)
+    reference = load_image(baseline, size=(image.shape[1], image.shape[0]))
+    delta = np.abs(image - reference).max(axis=2)
+    Image.fromarray((255 - 255 * delta).astype(np.uint8)).save(filename)
+
+
+def check_file(
+    input_file: str,
+    baseline_file: str,
+    output_dir: str,
+    dpi: int,
+    tolerance: float,
+) -> dict:
+    # runs in a worker process, errors are reported rather than raised
+    name = os.path.splitext(os.path.basename(input_file))[0]
+    output_file = os.path.join(output_dir, name + ".png")
+    result = {"name": name}
+    try:
+        start = time.perf_counter()
+        data, options = PESInputFileParser().read_input_file(input_file)
+        surface = PES.from_dataframe(data)
+        parsed = time.perf_counter()
+        PESGridEnhancer.enhance_surface(surface)
+        enhanced = time.perf_counter()
+        # the test dpi replaces the resolution of the input file
+        options = SweepVariant({Option.RESOLUTION: str(dpi)}, output_file).apply(
+            options
+        )
+        Plotter(surface, output_file, options).plot()
+        rendered = time.perf_counter()
+        result.update(
+            {
+                "parse": parsed - start,
+                "curves": enhanced - parsed,
+                "render": rendered - enhanced,
+                "total": rendered - start,
+            }
+        )
+        if os.path.isfile(baseline_file):
+            result.update(compare_images(output_file, baseline_file, tolerance))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def load_timings(filename: str) -> dict[str, float]:
+    if filename is None or not os.path.isfile(filename):
+        return {}
+    with open(filename, "r") as file:
+        return json.load(file)
+
+
+def save_timings(results: list[dict], filename: str) -> None:
+    logger.info("Writing timing baseline to {}".format(filename))
+    with open(filename, "w") as file:
+        json.dump(
+            {x["name"]: x["total"] for x in results if "total" in x}, file, indent=2
+        )
+
+
+def get_status(result: dict, threshold: float) -> str:
+    if "error" in result:
+        return "ERROR"
+    if "changed" not in result:
+        return "NEW"
+    return "FAIL" if result["changed"] > threshold else "ok"
+
+
+def report(results: list[dict], timings: dict[str, float], threshold: float) -> int:
+    header = "{:<32} {:>6} {:>9} {:>9} {:>9} {:>8} {:>8} {:>8}".format(
+        "file", "status", "changed", "mean", "max", "curves", "render", "total"
+    )
+    if len(timings) > 0:
+        header += " {:>8} {:>7}".format("before", "speedup")
+    lines = [header, "-" * len(header)]
+    failed = 0
+    for result in results:
+        status = get_status(result, threshold)
+        failed += status in ["ERROR", "FAIL"]
+        if "error" in result:
+            lines.append(
+                "{:<32} {:>6} {}".format(result["name"], status, result["error"])
+            )
+            continue
+        line = "{:<32} {:>6} {:>9} {:>9} {:>9} {:>8.3f} {:>8.3f} {:>8.3f}".format(
+            result["name"],
+            status,
+            "{:.3%}".format(result["changed"]) if "changed" in result else "-",
+            "{:.4f}".format(result["mean_delta"]) if "changed" in result else "-",
+            "{:.3f}".format(result["max_delta"]) if "changed" in result else "-",
+            result["curves"],
+            result["render"],
+            result["total"],
+        )
+        if result["name"] in timings:
+            before = timings[result["name"]]
+            line += " {:>8.3f} {:>6.2f}x".format(before, before / result["total"])
+        lines.append(line)
+    print("\n".join(lines))
+    return failed
+
+
+def run(
+    input_dir: str = "inputs",
+    baseline_dir: str = "outputs",
+    output_dir: str = None,
+    dpi: int = 60,
+    tolerance: float = 0.2,
+    threshold: float = 0.005,
+    workers: int = os.cpu_count(),
+    timings_file: str = None,
+    save: bool = False,
+) -> int:
+    # returns the number of files with over threshold of their pixels changed
+    files = PESInputFileParser.get_input_files(input_dir)
+    temporary = tempfile.TemporaryDirectory() if output_dir is None else None
+    render_dir = temporary.name if temporary is not None else output_dir
+    os.makedirs(render_dir, exist_ok=True)
+    baselines = [
+        os.path.join(baseline_dir, os.path.splitext(os.path.basename(file))[0] + ".png")
+        for file in files
+    ]
+
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(
+                pool.map(
+                    check_file,
+                    files,
+                    baselines,
+                    [render_dir] * len(files),
+                    [dpi] * len(files),
+                    [tolerance] * len(files),
+                )
+            )
+        if output_dir is not None:
+            for result, baseline in zip(results, baselines):
+                if get_status(result, threshold) == "FAIL":
+                    write_diff(
+                        os.path.join(output_dir, result["name"] + ".png"),
+                        baseline,
+                        os.path.join(output_dir, result["name"] + "_diff.png"),
+                    )
+    finally:
+        if temporary is not None:
+            temporary.cleanup()
+    elapsed = time.perf_counter() - start
+
+    failed = report(results, load_timings(timings_file), threshold)
+    print(
+        "{} files, {} failed, {:.2f}s with {} workers".format(
+            len(results), failed, elapsed, workers
+        )
+    )
+    if save and timings_file is not None:
+        save_timings(results, timings_file)
+    return failed
+
+
+@click.command()
+@click.option("-i", "--input-dir", default="inputs", help="Folder of input files.")
+@click.option(
+    "-b", "--baseline-dir", default="outputs", help="Folder of baseline images."
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    default=None,
+    help="Keep renders and write *_diff.png for failures here.",
+)
+@click.option("--dpi", default=60, help="Test resolution.")
+@click.option(
+    "--tolerance", default=0.2, help="Per-pixel difference (0-1) counted as changed."
+)
+@click.option(
+    "--threshold", default=0.005, help="Fraction of changed pixels failing a file."
+)
+@click.option("--workers", default=os.cpu_count(), help="Number of processes.")
+@click.option(
+    "--timings",
+    "timings_file",
+    default=None,
+    help="JSON timing baseline to compare against.",
+)
+@click.option("--save", is_flag=True, help="Write the current timings to --timings.")
+def main(**kwargs) -> None:
+    Log.set_level("WARNING")
+    sys.exit(1 if run(**kwargs) > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()